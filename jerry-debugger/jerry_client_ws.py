@@ -18,16 +18,27 @@ from __future__ import print_function
 from cmd import Cmd
 from pprint import pprint  # For the readable stack printing.
 import argparse
+import array
+import bisect
+import collections
+import csv
+import json
 import logging
 import re
 import select
-import socket
 import struct
 import sys
 import math
+import threading
 import time
 
-from jerry_client_ws_con import Connect
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from jerry_client_ws_common import add_common_arguments, parse_arguments, run_client
+from jerry_client_ws_con import Connect, ReplayConnect
 
 # Expected debugger protocol version.
 #JERRY_DEBUGGER_VERSION = 3
@@ -76,6 +87,16 @@ JERRY_DEBUGGER_OUTPUT_WARNING = 3
 JERRY_DEBUGGER_OUTPUT_DEBUG = 4
 JERRY_DEBUGGER_OUTPUT_TRACE = 5
 
+# Fields of the memory statistics
+MEMSTATS_FIELDS = ["allocated", "byte_code", "string", "object", "property"]
+# Default number of kept memory statistics samples
+MEMSTATS_SAMPLE_LIMIT = 4096
+# Default number of profiler samples per second
+PROFILE_DEFAULT_RATE = 100
+# The stopped engine reads the socket in every 100 ms and a STOP received together
+# with CONTINUE cancels it, so samples are not requested sooner after a resume.
+SAMPLE_RESUME_DELAY = 0.15
+
 
 # Messages sent by the client to server.
 JERRY_DEBUGGER_FREE_BYTE_CODE_CP = 1
@@ -100,6 +121,13 @@ JERRY_DEBUGGER_EVAL_PART = 18
 #MAX_BUFFER_SIZE = 128
 WEBSOCKET_BINARY_FRAME = 2
 WEBSOCKET_FIN_BIT = 0x80
+# 2: websocket frame header, 4: mask
+WEBSOCKET_FRAME_HEADER_SIZE = 2 + 4
+
+# Header of the first string frame, 1: length of type byte, 4: length of an uint32 value
+STRING_FIRST_HEADER_SIZE = 1 + 4
+# Header of the other string frames, 1: length of type byte
+STRING_PART_HEADER_SIZE = 1
 
 
 def arguments_parse():
@@ -107,29 +135,33 @@ def arguments_parse():
 
     parser.add_argument("address", action="store", nargs="?", default="localhost:5001",
                         help="specify a unique network address for connection (default: %(default)s)")
-    parser.add_argument("-v", "--verbose", action="store_true", default=False,
-                        help="increase verbosity (default: %(default)s)")
-    parser.add_argument("--non-interactive", action="store_true", default=False,
-                        help="disable stop when newline is pressed (default: %(default)s)")
-    parser.add_argument("--color", action="store_true", default=False,
-                        help="enable color highlighting on source commands (default: %(default)s)")
+    add_common_arguments(parser)
     parser.add_argument("--display", action="store", default=None, type=int,
                         help="set display range")
-    parser.add_argument("--exception", action="store", default=None, type=int, choices=[0, 1],
-                        help="set exception config, usage 1: [Enable] or 0: [Disable]")
     parser.add_argument("--client-source", action="store", default=[], type=str, nargs="+",
                         help="specify a javascript source file to execute")
-
-    args = parser.parse_args()
-
-    if args.verbose:
-        logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.DEBUG)
-        logging.debug("Debug logging mode: ON")
-
-    return args
+    parser.add_argument("--memstats-sample", metavar="SECONDS", action="store", default=None, type=float,
+                        help="sample the memory statistics periodically while the target runs")
+    parser.add_argument("--memstats-export", metavar="FILE", action="store", default=None,
+                        help="export the memory statistics samples to a CSV or JSON (.json) file at exit")
+    parser.add_argument("--profile", metavar="HZ", action="store", default=None, type=float,
+                        help="profile the target with HZ backtrace samples per second while it runs")
+    parser.add_argument("--profile-export", metavar="FILE", action="store", default=None,
+                        help="export the profiled stacks in folded (flamegraph) format to FILE at exit")
+    parser.add_argument("--coverage", metavar="FILE", action="store", default=None,
+                        help="record the executed lines and write them to FILE in lcov format at exit")
+    parser.add_argument("--json", action="store_true", default=False,
+                        help="print the received events as JSON objects, one per line (default: %(default)s)")
+    parser.add_argument("--record", metavar="FILE", action="store", default=None,
+                        help="record the messages of the session into FILE")
+    parser.add_argument("--replay", metavar="FILE", action="store", default=None,
+                        help="process the messages received in a recorded session instead of connecting")
+
+    return parse_arguments(parser)
 
 
 class JerryBreakpoint(object):
+    __slots__ = ["line", "offset", "function", "active_index"]
 
     def __init__(self, line, offset, function):
         self.line = line
@@ -151,6 +183,19 @@ class JerryBreakpoint(object):
         return ("Breakpoint(line:%d, offset:%d, active_index:%d)"
                 % (self.line, self.offset, self.active_index))
 
+    def to_dict(self):
+        result = {"source": decode_text(self.function.source_name),
+                  "line": self.line}
+
+        if self.function.is_func:
+            result["function"] = {"name": decode_text(self.function.name),
+                                  "line": self.function.line,
+                                  "column": self.function.column}
+
+        if self.active_index >= 0:
+            result["index"] = self.active_index
+        return result
+
 
 class JerryPendingBreakpoint(object):
     def __init__(self, line=None, source_name=None, function=None):
@@ -168,36 +213,95 @@ class JerryPendingBreakpoint(object):
             result += "%s()" % (self.function)
         return result
 
+    def to_dict(self):
+        result = {"pending": True}
+
+        if self.line:
+            result["source"] = decode_text(self.source_name)
+            result["line"] = self.line
+        else:
+            result["function"] = {"name": decode_text(self.function)}
+
+        if self.index >= 0:
+            result["index"] = self.index
+        return result
+
+
+class JerrySource(object):
+    """ Source code shared by the functions of a parsed script, split into lines on demand """
+    __slots__ = ["text", "lines"]
+
+    def __init__(self, text):
+        self.text = text
+        self.lines = None
+
+    def get_lines(self):
+        if self.lines is None:
+            self.lines = re.split("\r\n|[\r\n]", self.text)
+
+            if len(self.lines) > 1 and not self.lines[-1]:
+                self.lines.pop()
+
+        return self.lines
+
 
 class JerryFunction(object):
+    """ Function with its breakpoint locations
+
+    The lines and offsets of the breakpoints are stored in sorted arrays and
+    JerryBreakpoint objects are only created when a breakpoint is accessed.
+    """
     # pylint: disable=too-many-instance-attributes,too-many-arguments
+    __slots__ = ["is_func", "byte_code_cp", "source", "source_name", "name", "line", "column",
+                 "first_breakpoint_line", "first_breakpoint_offset",
+                 "lines", "line_offsets", "offsets", "offset_lines", "breakpoints"]
+
     def __init__(self, is_func, byte_code_cp, source, source_name, line, column, name, lines, offsets):
         self.is_func = is_func
         self.byte_code_cp = byte_code_cp
-        self.source = re.split("\r\n|[\r\n]", source)
+        self.source = source
         self.source_name = source_name
         self.name = name
-        self.lines = {}
-        self.offsets = {}
         self.line = line
         self.column = column
         self.first_breakpoint_line = lines[0]
         self.first_breakpoint_offset = offsets[0]
 
-        if len(self.source) > 1 and not self.source[-1]:
-            self.source.pop()
+        # When a line has multiple breakpoints the last one is used.
+        line_map = dict(zip(lines, offsets))
+        offset_map = dict(zip(offsets, lines))
+
+        self.lines = array.array("I", sorted(line_map))
+        self.line_offsets = array.array("I", [line_map[line] for line in self.lines])
+        self.offsets = array.array("I", sorted(offset_map))
+        self.offset_lines = array.array("I", [offset_map[offset] for offset in self.offsets])
+
+        # Breakpoints which have been accessed, keyed by their offset.
+        self.breakpoints = {}
+
+    def has_line(self, line):
+        index = bisect.bisect_left(self.lines, line)
+        return index < len(self.lines) and self.lines[index] == line
 
-        for i, line in enumerate(lines):
-            offset = offsets[i]
+    def get_breakpoint(self, offset):
+        breakpoint = self.breakpoints.get(offset)
+
+        if breakpoint is None:
+            line = self.offset_lines[bisect.bisect_left(self.offsets, offset)]
             breakpoint = JerryBreakpoint(line, offset, self)
-            self.lines[line] = breakpoint
-            self.offsets[offset] = breakpoint
+            self.breakpoints[offset] = breakpoint
+
+        return breakpoint
+
+    def get_line_breakpoint(self, line):
+        return self.get_breakpoint(self.line_offsets[bisect.bisect_left(self.lines, line)])
 
     def __repr__(self):
         result = ("Function(byte_code_cp:0x%x, source_name:%r, name:%r, line:%d, column:%d { "
                   % (self.byte_code_cp, self.source_name, self.name, self.line, self.column))
 
-        result += ','.join([str(breakpoint) for breakpoint in self.lines.values()])
+        result += ','.join([str(JerryBreakpoint(line, self.line_offsets[i], self))
+                            for i, line in enumerate(self.lines)])
 
         return result + " })"
 
@@ -212,7 +316,6 @@ class DebuggerPrompt(Cmd):
         self.quit = False
         self.cont = True
         self.non_interactive = False
-        self.client_sources = []
 
     def precmd(self, line):
         self.stop = False
@@ -338,12 +441,10 @@ class DebuggerPrompt(Cmd):
                 return
 
             if breakpoint_index in self.debugger.active_breakpoint_list:
-                breakpoint = self.debugger.active_breakpoint_list[breakpoint_index]
-                del self.debugger.active_breakpoint_list[breakpoint_index]
-                breakpoint.active_index = -1
-                self.debugger.send_breakpoint(breakpoint)
+                self.debugger.delete_active_breakpoint(breakpoint_index)
             elif breakpoint_index in self.debugger.pending_breakpoint_list:
-                del self.debugger.pending_breakpoint_list[breakpoint_index]
+                self.debugger.remove_pending_breakpoint(breakpoint_index)
+                self.debugger.report_event({"event": "delete", "index": breakpoint_index})
                 if not self.debugger.pending_breakpoint_list:
                     self.debugger.send_parser_config(0)
             else:
@@ -363,13 +464,7 @@ class DebuggerPrompt(Cmd):
                 print("Error: Positive integer number expected, %s" % (val_errno))
                 return
 
-        message = struct.pack(self.connect.byte_order + "BBIB" + self.connect.idx_format,
-                              WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
-                              WEBSOCKET_FIN_BIT + 1 + 4,
-                              0,
-                              JERRY_DEBUGGER_GET_BACKTRACE,
-                              max_depth)
-        self.connect.send_message(message)
+        self.debugger.send_backtrace_request(max_depth)
         self.stop = True
 
     do_bt = do_backtrace
@@ -432,50 +527,7 @@ class DebuggerPrompt(Cmd):
         pprint(self.debugger.function_list)
 
     def _send_string(self, args, message_type):
-        size = len(args)
-
-        # 1: length of type byte
-        # 4: length of an uint32 value
-        message_header = 1 + 4
-        max_fragment = min(self.connect.max_message_size - message_header, size)
-
-        message = struct.pack(self.connect.byte_order + "BBIBI",
-                              WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
-                              WEBSOCKET_FIN_BIT + max_fragment + message_header,
-                              0,
-                              message_type,
-                              size)
-
-        if size == max_fragment:
-            self.connect.send_message(message + args)
-            self.stop = True
-            return
-
-        self.connect.send_message(message + args[0:max_fragment])
-        offset = max_fragment
-
-        if message_type == JERRY_DEBUGGER_EVAL:
-            message_type = JERRY_DEBUGGER_EVAL_PART
-        else:
-            message_type = JERRY_DEBUGGER_CLIENT_SOURCE_PART
-
-        # 1: length of type byte
-        message_header = 1
-
-        max_fragment = self.connect.max_message_size - message_header
-        while offset < size:
-            next_fragment = min(max_fragment, size - offset)
-
-            message = struct.pack(self.connect.byte_order + "BBIB",
-                                  WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
-                                  WEBSOCKET_FIN_BIT + next_fragment + message_header,
-                                  0,
-                                  message_type)
-
-            prev_offset = offset
-            offset += next_fragment
-            self.connect.send_message(message + args[prev_offset:offset])
-
+        self.debugger.send_string(args, message_type)
         self.stop = True
 
     def do_eval(self, args):
@@ -511,33 +563,89 @@ class DebuggerPrompt(Cmd):
         self.debugger.send_exception_config(enable)
 
     def do_memstats(self, args):
-        """ Memory statistics """
-        self._exec_command(args, JERRY_DEBUGGER_MEMSTATS)
-        return
+        """ Memory statistics, use 'memstats sample SECONDS [LIMIT]|off' to sample them while the target runs
+            and 'memstats export FILE' to save the samples as CSV or JSON (.json) """
+        args = args.split()
+
+        if not args:
+            self._exec_command("", JERRY_DEBUGGER_MEMSTATS)
+        elif args[0] == "sample" and len(args) == 2 and args[1] == "off":
+            self.debugger.memstats_sampler.stop()
+            print("Memory statistics sampling disabled")
+        elif args[0] == "sample" and len(args) in [2, 3]:
+            try:
+                interval = float(args[1])
+                limit = int(args[2]) if len(args) == 3 else MEMSTATS_SAMPLE_LIMIT
+                if interval <= 0 or limit <= 0:
+                    raise ValueError(" ".join(args[1:]))
+            except ValueError as val_errno:
+                print("Error: Positive interval and limit expected: %s" % (val_errno))
+                return
+
+            self.debugger.memstats_sampler.start(interval, limit)
+            print("Sampling memory statistics in every %g seconds" % (interval))
+        elif args[0] == "export" and len(args) == 2:
+            count = self.debugger.memstats_sampler.export(args[1])
+            print("%d samples exported to %s" % (count, args[1]))
+        else:
+            print("Error: Invalid arguments: %s" % (" ".join(args)))
 
     do_ms = do_memstats
 
-    def store_client_sources(self, args):
-        self.client_sources = args
+    def do_profile(self, args):
+        """ Sampling profiler, use 'profile start [HZ]|stop', 'profile report [N]' to print the most sampled
+            functions and lines and 'profile export FILE' to save the stacks in folded (flamegraph) format """
+        args = args.split()
+        profiler = self.debugger.profiler
 
-    def send_client_source(self):
-        # Send no more source message if there is no source
-        if not self.client_sources:
-            self.send_no_more_source()
-            return
+        if args and args[0] == "start" and len(args) <= 2:
+            try:
+                rate = float(args[1]) if len(args) == 2 else PROFILE_DEFAULT_RATE
+                if rate <= 0:
+                    raise ValueError(args[1])
+            except ValueError as val_errno:
+                print("Error: Positive sampling rate expected: %s" % (val_errno))
+                return
 
-        path = self.client_sources.pop(0)
-        if not path.lower().endswith('.js'):
-            sys.exit("Error: Javascript file expected!")
-            return
+            profiler.start(1.0 / rate)
+            print("Profiling with %g samples per second" % (rate))
+        elif args == ["stop"]:
+            profiler.stop()
+            print("Profiling stopped")
+        elif args and args[0] == "report" and len(args) <= 2:
+            try:
+                count = int(args[1]) if len(args) == 2 else 10
+            except ValueError as val_errno:
+                print("Error: Integer number expected, %s" % (val_errno))
+                return
+
+            print(profiler.get_report(count))
+        elif args and args[0] == "export" and len(args) == 2:
+            count = profiler.export(args[1])
+            print("%d stacks exported to %s" % (count, args[1]))
+        else:
+            print("Error: Invalid arguments: %s" % (" ".join(args)))
 
-        with open(path, 'r') as src_file:
-            content = path + "\0" + src_file.read()
-            self._send_string(content, JERRY_DEBUGGER_CLIENT_SOURCE)
 
-    def send_no_more_source(self):
-        self._exec_command("", JERRY_DEBUGGER_NO_MORE_SOURCES)
-        self.cont = True
+class DebuggerAction(object):
+    """ Result of processing the messages received from the target """
+    END = 0
+    WAIT = 1
+    TEXT = 2
+    PROMPT = 3
+
+    def __init__(self, action_type, text=None, event=None):
+        self.type = action_type
+        self._text = text
+        self.event = event
+
+    @property
+    def text(self):
+        """ Text of the action, events are described by a JSON object """
+        if self._text is None and self.event is not None:
+            self._text = json.dumps(self.event)
+        return self._text
+
 
 class Multimap(object):
 
@@ -567,8 +675,282 @@ class Multimap(object):
         return "Multimap(%r)" % (self.map)
 
 
+class MessageAccumulator(object):
+    """ Collects the payload fragments of a message which is split into several frames
+
+    The fragments are appended to a bytearray and converted to a string
+    only once, when the text is requested.
+    """
+    __slots__ = ["data", "text"]
+
+    def __init__(self):
+        self.data = bytearray()
+        self.text = ""
+
+    def append(self, fragment):
+        self.data += fragment
+        self.text = None
+
+    def get_text(self):
+        if self.text is None:
+            self.text = bytes(self.data)
+        return self.text
+
+    def clear(self):
+        del self.data[:]
+        self.text = ""
+
+    def __len__(self):
+        return len(self.data)
+
+
+class PeriodicSampler(object):
+    """ Base of the samplers which stop the running target periodically
+
+    The debugger stops the target when a sample is due, sends the request of the
+    sampler at the next stop and resumes the target after the answer is received.
+    """
+
+    def __init__(self):
+        self.interval = None
+        self.next_sample = 0
+
+    def start(self, interval):
+        self.interval = interval
+        self.next_sample = time.time() + interval
+
+    def stop(self):
+        self.interval = None
+
+    def get_timeout(self):
+        """ Return the seconds until the next sample, None if sampling is disabled """
+        if self.interval is None:
+            return None
+        return max(self.next_sample - time.time(), 0)
+
+    def schedule(self):
+        if self.interval is not None:
+            self.next_sample = time.time() + self.interval
+
+    def send_request(self, debugger):
+        raise NotImplementedError
+
+
+class MemstatsSampler(PeriodicSampler):
+    """ Keeps the last received memory statistics in a bounded ring """
+
+    def __init__(self):
+        PeriodicSampler.__init__(self)
+        self.samples = collections.deque(maxlen=MEMSTATS_SAMPLE_LIMIT)
+
+    def start(self, interval, limit=MEMSTATS_SAMPLE_LIMIT):
+        # pylint: disable=arguments-differ
+        if limit != self.samples.maxlen:
+            self.samples = collections.deque(self.samples, maxlen=limit)
+        PeriodicSampler.start(self, interval)
+
+    def send_request(self, debugger):
+        debugger.send_command(JERRY_DEBUGGER_MEMSTATS)
+
+    def add(self, memory_stats):
+        self.samples.append((time.time(),) + tuple(memory_stats))
+
+    def export(self, path):
+        """ Write the samples to a CSV or a JSON (.json) file and return their count """
+        fields = ["time"] + MEMSTATS_FIELDS
+
+        with open(path, "w") as export_file:
+            if path.lower().endswith(".json"):
+                json.dump([dict(zip(fields, sample)) for sample in self.samples], export_file, indent=1)
+            else:
+                writer = csv.writer(export_file)
+                writer.writerow(fields)
+                writer.writerows(self.samples)
+
+        return len(self.samples)
+
+
+class Profiler(PeriodicSampler):
+    """ Collects the backtraces of the running target """
+
+    def __init__(self):
+        PeriodicSampler.__init__(self)
+        self.samples = 0
+        self.stacks = collections.Counter()
+        self.function_hits = collections.Counter()
+        self.line_hits = collections.Counter()
+
+    def send_request(self, debugger):
+        debugger.send_backtrace_request(0)
+
+    @staticmethod
+    def get_frame_name(breakpoint):
+        function = breakpoint.function
+        if function.is_func:
+            name = function.name or "<anonymous>"
+        else:
+            name = "<global>"
+        return "%s (%s:%d)" % (name, function.source_name or "<unknown>", function.line)
+
+    def add(self, frames):
+        """ Count the backtrace, frames start with the innermost function """
+        if not frames:
+            return
+
+        names = [self.get_frame_name(breakpoint) for breakpoint in frames]
+
+        self.samples += 1
+        self.stacks[";".join(reversed(names))] += 1
+        self.function_hits[names[0]] += 1
+        self.line_hits["%s:%d" % (frames[0].function.source_name or "<unknown>", frames[0].line)] += 1
+
+    def get_report(self, count):
+        result = ["%d samples" % (self.samples)]
+
+        for title, hits in [("Functions", self.function_hits), ("Lines", self.line_hits)]:
+            result.append("=== %s ===" % (title))
+            for name, hit_count in hits.most_common(count):
+                result.append("%6.2f%% %6d  %s" % (100.0 * hit_count / self.samples, hit_count, name))
+        return "\n".join(result)
+
+    def export(self, path):
+        """ Write the stacks in the folded format of flamegraph.pl and return their count """
+        with open(path, "w") as export_file:
+            for stack in sorted(self.stacks):
+                export_file.write("%s %d\n" % (stack, self.stacks[stack]))
+
+        return len(self.stacks)
+
+
+class Coverage(object):
+    """ Records the executed breakpoint locations in a bitmap per function
+
+    Every location is enabled when its function is parsed and disabled after its
+    first hit, so the target stops at most once for each location.
+    """
+
+    def __init__(self):
+        # The functions are kept after their byte code is released.
+        self.bitmaps = collections.OrderedDict()
+
+    def add_function(self, debugger, function):
+        self.bitmaps[function] = bytearray((len(function.offsets) + 7) >> 3)
+
+        for offset in function.offsets:
+            debugger.send_breakpoint_update(function, offset, True)
+
+    def _get_index(self, function, offset):
+        """ Return the index of a location which is not hit yet, -1 otherwise """
+        bitmap = self.bitmaps.get(function)
+        if bitmap is None:
+            return -1
+
+        index = bisect.bisect_left(function.offsets, offset)
+        if index >= len(function.offsets) or function.offsets[index] != offset:
+            return -1
+
+        if bitmap[index >> 3] & (1 << (index & 7)):
+            return -1
+        return index
+
+    def is_pending(self, function, offset):
+        return self._get_index(function, offset) >= 0
+
+    def add_hit(self, debugger, function, offset):
+        """ Record a hit, returns True when only the coverage stopped the target """
+        index = self._get_index(function, offset)
+        if index < 0:
+            return False
+
+        self.bitmaps[function][index >> 3] |= 1 << (index & 7)
+
+        # Breakpoints set by the user are kept.
+        breakpoint = function.breakpoints.get(offset)
+        if breakpoint is not None and breakpoint.active_index >= 0:
+            return False
+
+        debugger.send_breakpoint_update(function, offset, False)
+        return True
+
+    def export(self, path):
+        """ Write the line coverage in lcov format, returns the number of sources """
+        sources = collections.OrderedDict()
+
+        for function, bitmap in self.bitmaps.items():
+            # Eval code has no source file.
+            if not function.source_name:
+                continue
+
+            lines, functions = sources.setdefault(function.source_name, ({}, []))
+            executed = False
+
+            for index, line in enumerate(function.offset_lines):
+                hit = bool(bitmap[index >> 3] & (1 << (index & 7)))
+                lines[line] = lines.get(line, False) or hit
+                executed = executed or hit
+
+            if function.is_func:
+                functions.append((function, executed))
+
+        with open(path, "w") as export_file:
+            for source_name, (lines, functions) in sources.items():
+                export_file.write("TN:\nSF:%s\n" % (source_name))
+
+                for function, executed in functions:
+                    export_file.write("FN:%d,%s\n" % (function.line, function.name or "<anonymous>"))
+                for function, executed in functions:
+                    export_file.write("FNDA:%d,%s\n" % (executed, function.name or "<anonymous>"))
+                export_file.write("FNF:%d\nFNH:%d\n" % (len(functions), len([item for item in functions if item[1]])))
+
+                for line in sorted(lines):
+                    export_file.write("DA:%d,%d\n" % (line, lines[line]))
+                export_file.write("LF:%d\nLH:%d\n" % (len(lines), len([line for line in lines if lines[line]])))
+                export_file.write("end_of_record\n")
+
+        return len(sources)
+
+
+class ClientSourceLoader(threading.Thread):
+    """ Reads and encodes the client sources in the background
+
+    The encoded messages are queued in the order of the paths, so a
+    WAIT_FOR_SOURCE request can be answered without waiting for disk I/O.
+    """
+
+    def __init__(self, debugger, paths):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.debugger = debugger
+        self.paths = list(paths)
+        self.messages = queue.Queue()
+
+    def run(self):
+        # Every error is passed to the consumer, which would wait forever otherwise.
+        try:
+            self.load_sources()
+        except BaseException as error:  # pylint: disable=broad-except
+            self.messages.put(error)
+
+    def load_sources(self):
+        for path in self.paths:
+            if not path.lower().endswith('.js'):
+                raise SystemExit("Error: Javascript file expected!")
+
+            with open(path, 'r') as src_file:
+                content = path + "\0" + src_file.read()
+
+            self.messages.put(self.debugger.encode_string(content, JERRY_DEBUGGER_CLIENT_SOURCE))
+
+    def get_message(self):
+        """ Return the encoded message of the next source, raises the error of the loader thread """
+        message = self.messages.get()
+        if isinstance(message, BaseException):
+            raise message
+        return message
+
+
 class JerryDebugger(object):
-    # pylint: disable=too-many-instance-attributes,too-many-statements
+    # pylint: disable=too-many-instance-attributes,too-many-statements,too-many-public-methods
     def __init__(self, connect):
         self.connect = connect
         self.function_list = {}
@@ -576,7 +958,11 @@ class JerryDebugger(object):
         self.next_breakpoint_index = 0
         self.active_breakpoint_list = {}
         self.pending_breakpoint_list = {}
-        self.line_list = Multimap()
+        # Pending breakpoints keyed by the base name of the source or by the function name.
+        self.pending_source_list = Multimap()
+        self.pending_function_list = Multimap()
+        # Breakpoints keyed by (base name of the source, line).
+        self.source_line_list = Multimap()
         self.display = 0
         self.default_viewrange = 3
         self.green = ''
@@ -589,38 +975,111 @@ class JerryDebugger(object):
         self.src_offset = 0
         self.src_offset_diff = 0
         self.repeats_remain = 0
+        self.exception_string = MessageAccumulator()
+        self.client_sources = []
+        self.client_source_loader = None
+        # Answer of the pending breakpoint question, None asks the user.
+        self.add_pending_breakpoints = None
+        # Events are described by dictionaries (printed as JSON objects) instead of text.
+        self.json_output = False
+        # Receives the events of the commands (e.g. break and delete) in JSON mode.
+        self.event_handler = None
+        self.memstats_sampler = MemstatsSampler()
+        self.profiler = Profiler()
+        # Line coverage is recorded when it is not None.
+        self.coverage = None
+        # Breakpoint update frames are sent together with the next message.
+        self.breakpoint_updates = []
+        # The sampler which stopped the target and the state of its request.
+        self.sampler = None
+        self.sampler_requested = False
+        # The hit hidden by the sampler request, and whether the user stopped the target meanwhile.
+        self.sampler_hit = None
+        self.sampler_cancelled = False
+        # Time of the last continue command, None when the target is not sampled.
+        self.resume_time = None
+
+    def report_event(self, event):
+        if self.json_output and self.event_handler is not None:
+            self.event_handler(event)
+
+    def delete_active_breakpoint(self, index):
+        breakpoint = self.active_breakpoint_list.pop(index)
+        breakpoint.active_index = -1
+        self.send_breakpoint(breakpoint)
+        self.report_event({"event": "delete", "index": index})
 
     def delete_active(self):
-        for i in self.active_breakpoint_list.values():
-            breakpoint = self.active_breakpoint_list[i.active_index]
-            del self.active_breakpoint_list[i.active_index]
-            breakpoint.active_index = -1
-            self.send_breakpoint(breakpoint)
+        for index in list(self.active_breakpoint_list):
+            self.delete_active_breakpoint(index)
 
     def delete_pending(self):
         if self.pending_breakpoint_list:
+            for index in self.pending_breakpoint_list:
+                self.report_event({"event": "delete", "index": index})
             self.pending_breakpoint_list.clear()
+            self.pending_source_list = Multimap()
+            self.pending_function_list = Multimap()
             self.send_parser_config(0)
 
+    def insert_pending_breakpoint(self, breakpoint):
+        self.pending_breakpoint_list[breakpoint.index] = breakpoint
+
+        if breakpoint.line:
+            self.pending_source_list.insert(source_basename(breakpoint.source_name), breakpoint)
+        else:
+            self.pending_function_list.insert(breakpoint.function, breakpoint)
+
+    def remove_pending_breakpoint(self, index):
+        breakpoint = self.pending_breakpoint_list.pop(index)
+
+        if breakpoint.line:
+            self.pending_source_list.delete(source_basename(breakpoint.source_name), breakpoint)
+        else:
+            self.pending_function_list.delete(breakpoint.function, breakpoint)
+
     def breakpoint_pending_exists(self, breakpoint):
-        for existing_bp in self.pending_breakpoint_list.values():
-            if (breakpoint.line and existing_bp.source_name == breakpoint.source_name and \
-                  existing_bp.line == breakpoint.line) \
-               or (not breakpoint.line and existing_bp.function == breakpoint.function):
-                return True
+        if breakpoint.line:
+            for existing_bp in self.pending_source_list.get(source_basename(breakpoint.source_name)):
+                if existing_bp.source_name == breakpoint.source_name and existing_bp.line == breakpoint.line:
+                    return True
+            return False
+
+        return bool(self.pending_function_list.get(breakpoint.function))
+
+    def send_message(self, message):
+        """ Send the message in one write together with the queued breakpoint updates """
+        if self.breakpoint_updates:
+            self.breakpoint_updates.append(message)
+            message = bytearray().join(self.breakpoint_updates)
+            del self.breakpoint_updates[:]
+
+        self.connect.send_message(message)
 
-        return False
+    def flush_breakpoint_updates(self):
+        if self.breakpoint_updates:
+            self.connect.send_message(bytearray().join(self.breakpoint_updates))
+            del self.breakpoint_updates[:]
 
     def send_breakpoint(self, breakpoint):
+        enable = breakpoint.active_index >= 0
+
+        if not enable and self.coverage is not None:
+            # Locations which are not hit yet stay enabled for the coverage.
+            enable = self.coverage.is_pending(breakpoint.function, breakpoint.offset)
+
+        self.send_breakpoint_update(breakpoint.function, breakpoint.offset, enable)
+
+    def send_breakpoint_update(self, function, offset, enable):
         message = struct.pack(self.connect.byte_order + "BBIBB" + self.connect.cp_format + self.connect.idx_format,
                               WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
                               WEBSOCKET_FIN_BIT + 1 + 1 + self.connect.cp_size + 4,
                               0,
                               JERRY_DEBUGGER_UPDATE_BREAKPOINT,
-                              int(breakpoint.active_index >= 0),
-                              breakpoint.function.byte_code_cp,
-                              breakpoint.offset)
-        self.connect.send_message(message)
+                              int(enable),
+                              function.byte_code_cp,
+                              offset)
+        self.breakpoint_updates.append(message)
 
     def set_colors(self):
         self.nocolor = '\033[0m'
@@ -638,7 +1097,7 @@ class JerryDebugger(object):
                             0,
                             JERRY_DEBUGGER_FREE_BYTE_CODE_CP,
                             byte_code_cp)
-        self.connect.send_message(message)
+        self.send_message(message)
 
     def send_command(self, command):
         message = struct.pack(self.connect.byte_order + "BBIB",
@@ -646,7 +1105,13 @@ class JerryDebugger(object):
                               WEBSOCKET_FIN_BIT + 1,
                               0,
                               command)
-        self.connect.send_message(message)
+        self.send_message(message)
+
+        if command == JERRY_DEBUGGER_CONTINUE:
+            self.resume_time = time.time()
+        elif command in [JERRY_DEBUGGER_STEP, JERRY_DEBUGGER_NEXT, JERRY_DEBUGGER_FINISH, JERRY_DEBUGGER_STOP]:
+            # The next stop belongs to the user.
+            self.resume_time = None
 
     def send_exception_config(self, enable):
         message = struct.pack(self.connect.byte_order + "BBIBB",
@@ -655,96 +1120,487 @@ class JerryDebugger(object):
                               0,
                               JERRY_DEBUGGER_EXCEPTION_CONFIG,
                               enable)
-        self.connect.send_message(message)
+        self.send_message(message)
 
     def send_parser_config(self, enable):
+        if self.coverage is not None:
+            # The parser waits until the locations of the new functions are enabled.
+            enable = 1
+
         message = struct.pack(self.connect.byte_order + "BBIBB",
                               WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
                               WEBSOCKET_FIN_BIT + 1 + 1,
                               0,
                               JERRY_DEBUGGER_PARSER_CONFIG,
                               enable)
-        self.connect.send_message(message)
+        self.send_message(message)
 
+    def get_string_layout(self, size):
+        """ Return the first and the maximum fragment size and the buffer size of an encoded string """
+        max_message_size = self.connect.max_message_size
 
-# pylint: disable=too-many-branches,too-many-locals,too-many-statements
-def parse_source(connect, debugger, data):
-    source_code = ""
-    source_code_name = ""
-    function_name = ""
-    stack = [{"line": 1,
-              "column": 1,
-              "name": "",
-              "lines": [],
-              "offsets": []}]
-    new_function_list = {}
+        first_fragment = min(max_message_size - STRING_FIRST_HEADER_SIZE, size)
+        max_fragment = max_message_size - STRING_PART_HEADER_SIZE
+        part_count = (size - first_fragment + max_fragment - 1) // max_fragment
 
-    while True:
-        if data is None:
-            return
+        buffer_size = (WEBSOCKET_FRAME_HEADER_SIZE + STRING_FIRST_HEADER_SIZE + size
+                       + part_count * (WEBSOCKET_FRAME_HEADER_SIZE + STRING_PART_HEADER_SIZE))
+        return first_fragment, max_fragment, buffer_size
 
-        buffer_type = ord(data[2])
-        buffer_size = ord(data[1]) - 1
+    def encode_string(self, args, message_type):
+        """ Encode the string into a single buffer holding all of its frames """
+        size = len(args)
+        first_fragment, max_fragment, buffer_size = self.get_string_layout(size)
+        message = bytearray(buffer_size)
+
+        struct.pack_into(self.connect.byte_order + "BBIBI", message, 0,
+                         WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
+                         WEBSOCKET_FIN_BIT + first_fragment + STRING_FIRST_HEADER_SIZE,
+                         0,
+                         message_type,
+                         size)
+        position = WEBSOCKET_FRAME_HEADER_SIZE + STRING_FIRST_HEADER_SIZE
+        message[position:position + first_fragment] = args[0:first_fragment]
+        position += first_fragment
 
-        logging.debug("Parser buffer type: %d, message size: %d", buffer_type, buffer_size)
+        if message_type == JERRY_DEBUGGER_EVAL:
+            message_type = JERRY_DEBUGGER_EVAL_PART
+        else:
+            message_type = JERRY_DEBUGGER_CLIENT_SOURCE_PART
 
-        if buffer_type == JERRY_DEBUGGER_PARSE_ERROR:
-            logging.error("Parser error!")
-            return
+        header_format = self.connect.byte_order + "BBIB"
+        offset = first_fragment
+        while offset < size:
+            next_fragment = min(max_fragment, size - offset)
 
-        elif buffer_type in [JERRY_DEBUGGER_SOURCE_CODE, JERRY_DEBUGGER_SOURCE_CODE_END]:
-            source_code += data[3:]
+            struct.pack_into(header_format, message, position,
+                             WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
+                             WEBSOCKET_FIN_BIT + next_fragment + STRING_PART_HEADER_SIZE,
+                             0,
+                             message_type)
+            position += WEBSOCKET_FRAME_HEADER_SIZE + STRING_PART_HEADER_SIZE
 
-        elif buffer_type in [JERRY_DEBUGGER_SOURCE_CODE_NAME, JERRY_DEBUGGER_SOURCE_CODE_NAME_END]:
-            source_code_name += data[3:]
+            message[position:position + next_fragment] = args[offset:offset + next_fragment]
+            position += next_fragment
+            offset += next_fragment
 
-        elif buffer_type in [JERRY_DEBUGGER_FUNCTION_NAME, JERRY_DEBUGGER_FUNCTION_NAME_END]:
-            function_name += data[3:]
+        return message
 
-        elif buffer_type == JERRY_DEBUGGER_PARSE_FUNCTION:
-            logging.debug("Source name: %s, function name: %s", source_code_name, function_name)
+    def send_string(self, args, message_type):
+        self.send_message(self.encode_string(args, message_type))
 
-            position = struct.unpack(connect.byte_order + connect.idx_format + connect.idx_format,
-                                     data[3: 3 + 4 + 4])
+    def store_client_sources(self, args):
+        self.client_sources = args
+        self.client_source_loader = ClientSourceLoader(self, args)
+        self.client_source_loader.start()
 
-            stack.append({"source": source_code,
-                          "source_name": source_code_name,
-                          "line": position[0],
-                          "column": position[1],
-                          "name": function_name,
-                          "lines": [],
-                          "offsets": []})
-            function_name = ""
+    def send_client_source(self):
+        # Send no more source message if there is no source
+        if not self.client_sources:
+            self.send_no_more_source()
+            return
 
-        elif buffer_type in [JERRY_DEBUGGER_BREAKPOINT_LIST, JERRY_DEBUGGER_BREAKPOINT_OFFSET_LIST]:
-            name = "lines"
-            if buffer_type == JERRY_DEBUGGER_BREAKPOINT_OFFSET_LIST:
-                name = "offsets"
+        self.client_sources.pop(0)
+        self.send_message(self.client_source_loader.get_message())
 
-            logging.debug("Breakpoint %s received", name)
+    def send_no_more_source(self):
+        self.send_command(JERRY_DEBUGGER_NO_MORE_SOURCES)
 
-            buffer_pos = 3
-            while buffer_size > 0:
-                line = struct.unpack(connect.byte_order + connect.idx_format,
-                                     data[buffer_pos: buffer_pos + 4])
-                stack[-1][name].append(line[0])
-                buffer_pos += 4
-                buffer_size -= 4
+    def send_backtrace_request(self, max_depth):
+        message = struct.pack(self.connect.byte_order + "BBIB" + self.connect.idx_format,
+                              WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
+                              WEBSOCKET_FIN_BIT + 1 + 4,
+                              0,
+                              JERRY_DEBUGGER_GET_BACKTRACE,
+                              max_depth)
+        self.send_message(message)
+
+    def get_sample_timeout(self):
+        """ Return the seconds until the next sample is due, None if no sample is due """
+        if self.sampler is not None or self.resume_time is None:
+            return None
+
+        timeouts = [sampler.get_timeout() for sampler in [self.memstats_sampler, self.profiler]]
+        timeouts = [timeout for timeout in timeouts if timeout is not None]
+        if not timeouts:
+            return None
+        return max(min(timeouts), self.resume_time + SAMPLE_RESUME_DELAY - time.time(), 0)
+
+    def sample(self):
+        """ Stop the running target for the sampler which is due first """
+        samplers = [sampler for sampler in [self.memstats_sampler, self.profiler] if sampler.interval is not None]
+        if not samplers or self.sampler is not None or self.resume_time is None:
+            return
 
-        elif buffer_type == JERRY_DEBUGGER_BYTE_CODE_CP:
-            byte_code_cp = struct.unpack(connect.byte_order + connect.cp_format,
-                                         data[3: 3 + connect.cp_size])[0]
+        if time.time() < self.resume_time + SAMPLE_RESUME_DELAY:
+            return
 
-            logging.debug("Byte code cptr received: {0x%x}", byte_code_cp)
+        self.sampler = min(samplers, key=lambda sampler: sampler.next_sample)
+        self.sampler_requested = False
+        self.sampler_cancelled = False
+        self.send_command(JERRY_DEBUGGER_STOP)
 
-            func_desc = stack.pop()
+    def stop(self):
+        """ Stop the running target for the user, these stops are not hidden by the samplers """
+        if self.sampler is not None and self.sampler_requested:
+            # The target is already stopped, it is not resumed after the answer of the request.
+            self.sampler_cancelled = True
+            return
 
-            # We know the last item in the list is the general byte code.
-            if len(stack) == 0:
-                func_desc["source"] = source_code
-                func_desc["source_name"] = source_code_name
+        self.sampler = None
+        self.send_command(JERRY_DEBUGGER_STOP)
 
-            function = JerryFunction(len(stack) != 0,
+    def _finish_sample(self):
+        """ Resume the target after the answer of the sampler request, unless the user stopped it """
+        self.sampler.schedule()
+        self.sampler = None
+
+        if self.sampler_cancelled:
+            self.sampler_cancelled = False
+            return self._create_hit_action(JERRY_DEBUGGER_BREAKPOINT_HIT, self.sampler_hit)
+
+        self.send_command(JERRY_DEBUGGER_CONTINUE)
+        return None
+
+    def process_messages(self):
+        """ Process the received messages until the user or the caller has to act
+
+        Returns a DebuggerAction: WAIT when all available data is processed, TEXT for
+        output which needs no reply, PROMPT when the target waits for a command and
+        END when the connection is closed.
+        """
+        for data in self.connect.iter_messages():
+            action = self._process_message(data)
+            if action is not None:
+                return action
+
+        if self.connect.closed:
+            return DebuggerAction(DebuggerAction.END)
+
+        # Updates made while the target runs are not delayed until the next command.
+        self.flush_breakpoint_updates()
+        return DebuggerAction(DebuggerAction.WAIT)
+
+    def _process_message(self, data):
+        # pylint: disable=too-many-branches,too-many-locals,too-many-statements,too-many-return-statements
+        connect = self.connect
+        buffer_type = ord(data[2])
+        buffer_size = ord(data[1]) - 1
+
+        logging.debug("Main buffer type: %d, message size: %d", buffer_type, buffer_size)
+
+        if buffer_type in [JERRY_DEBUGGER_PARSE_ERROR,
+                           JERRY_DEBUGGER_BYTE_CODE_CP,
+                           JERRY_DEBUGGER_PARSE_FUNCTION,
+                           JERRY_DEBUGGER_BREAKPOINT_LIST,
+                           JERRY_DEBUGGER_SOURCE_CODE,
+                           JERRY_DEBUGGER_SOURCE_CODE_END,
+                           JERRY_DEBUGGER_SOURCE_CODE_NAME,
+                           JERRY_DEBUGGER_SOURCE_CODE_NAME_END,
+                           JERRY_DEBUGGER_FUNCTION_NAME,
+                           JERRY_DEBUGGER_FUNCTION_NAME_END]:
+            parse_source(connect, self, data)
+
+        elif buffer_type == JERRY_DEBUGGER_WAITING_AFTER_PARSE:
+            self.send_command(JERRY_DEBUGGER_PARSER_RESUME)
+
+        elif buffer_type == JERRY_DEBUGGER_RELEASE_BYTE_CODE_CP:
+            release_function(connect, self, data)
+
+        elif buffer_type in [JERRY_DEBUGGER_BREAKPOINT_HIT, JERRY_DEBUGGER_EXCEPTION_HIT]:
+            breakpoint_data = struct.unpack(connect.byte_order + connect.cp_format + connect.idx_format, data[3:])
+
+            if (self.coverage is not None and buffer_type == JERRY_DEBUGGER_BREAKPOINT_HIT
+                    and self.coverage.add_hit(self, self.function_list[breakpoint_data[0]], breakpoint_data[1])
+                    and self.resume_time is not None and self.sampler is None):
+                # Stops which only record the coverage are hidden while the target runs. The sampler
+                # requests are sent at these stops when a sample is due.
+                self.send_command(JERRY_DEBUGGER_CONTINUE)
+                return None
+
+            breakpoint = get_breakpoint(self, breakpoint_data)
+
+            if self.sampler is not None and not self.sampler_requested:
+                # Hits of the breakpoints set by the user are not hidden by the sampling.
+                if buffer_type == JERRY_DEBUGGER_BREAKPOINT_HIT and breakpoint[0].active_index < 0:
+                    self.sampler_requested = True
+                    self.sampler_hit = breakpoint
+                    self.sampler.send_request(self)
+                    return None
+
+                self.sampler = None
+
+            return self._create_hit_action(buffer_type, breakpoint)
+
+        elif buffer_type in [JERRY_DEBUGGER_EXCEPTION_STR, JERRY_DEBUGGER_EXCEPTION_STR_END]:
+            self.exception_string.append(data[3:])
+
+        elif buffer_type in [JERRY_DEBUGGER_BACKTRACE, JERRY_DEBUGGER_BACKTRACE_END]:
+            frames = []
+
+            while True:
+
+                # Each frame is a byte code cp and an offset, decoded with a single unpack.
+                count = buffer_size // (connect.cp_size + 4)
+                frame_data = struct.unpack(connect.byte_order + (connect.cp_format + connect.idx_format) * count,
+                                           data[3: 3 + count * (connect.cp_size + 4)])
+
+                for breakpoint_data in zip(frame_data[0::2], frame_data[1::2]):
+                    frames.append(get_breakpoint(self, breakpoint_data)[0])
+
+                if buffer_type == JERRY_DEBUGGER_BACKTRACE_END:
+                    break
+
+                data = connect.get_message(True)
+                buffer_type = ord(data[2])
+                buffer_size = ord(data[1]) - 1
+
+                if buffer_type not in [JERRY_DEBUGGER_BACKTRACE,
+                                       JERRY_DEBUGGER_BACKTRACE_END]:
+                    raise Exception("Backtrace data expected")
+
+            if self.sampler is self.profiler and self.sampler_requested:
+                self.profiler.add(frames)
+                return self._finish_sample()
+
+            if self.json_output:
+                return DebuggerAction(DebuggerAction.PROMPT,
+                                      event={"event": "backtrace",
+                                             "frames": [breakpoint.to_dict() for breakpoint in frames]})
+
+            result = ["Frame %d: %s" % (frame_index, breakpoint) for frame_index, breakpoint in enumerate(frames)]
+            return DebuggerAction(DebuggerAction.PROMPT, "\n".join(result) if result else None)
+
+        elif buffer_type in [JERRY_DEBUGGER_EVAL_RESULT,
+                             JERRY_DEBUGGER_EVAL_RESULT_END,
+                             JERRY_DEBUGGER_OUTPUT_RESULT,
+                             JERRY_DEBUGGER_OUTPUT_RESULT_END]:
+            accumulator = MessageAccumulator()
+            msg_type = buffer_type
+            while True:
+                if buffer_type in [JERRY_DEBUGGER_EVAL_RESULT_END,
+                                   JERRY_DEBUGGER_OUTPUT_RESULT_END]:
+                    subtype = ord(data[-1])
+                    accumulator.append(data[3:-1])
+                    break
+                else:
+                    accumulator.append(data[3:])
+
+                data = connect.get_message(True)
+                buffer_type = ord(data[2])
+                buffer_size = ord(data[1]) - 1
+                # Checks if the next frame would be an invalid data frame.
+                # If it is not the message type, or the end type of it, an exception is thrown.
+                if buffer_type not in [msg_type, msg_type + 1]:
+                    raise Exception("Invalid data caught")
+
+            message = accumulator.get_text()
+
+            if self.json_output:
+                return self._create_result_event(buffer_type, subtype, message)
+
+            # Subtypes of output
+            if buffer_type == JERRY_DEBUGGER_OUTPUT_RESULT_END:
+                message = message.rstrip('\n')
+                if subtype in [JERRY_DEBUGGER_OUTPUT_OK,
+                               JERRY_DEBUGGER_OUTPUT_DEBUG]:
+                    return DebuggerAction(DebuggerAction.TEXT, "%sout: %s%s" % (self.blue, self.nocolor, message))
+                elif subtype == JERRY_DEBUGGER_OUTPUT_WARNING:
+                    return DebuggerAction(DebuggerAction.TEXT,
+                                          "%swarning: %s%s" % (self.yellow, self.nocolor, message))
+                elif subtype == JERRY_DEBUGGER_OUTPUT_ERROR:
+                    return DebuggerAction(DebuggerAction.TEXT, "%serr: %s%s" % (self.red, self.nocolor, message))
+                elif subtype == JERRY_DEBUGGER_OUTPUT_TRACE:
+                    return DebuggerAction(DebuggerAction.TEXT, "%strace: %s%s" % (self.blue, self.nocolor, message))
+
+            # Subtypes of eval
+            elif buffer_type == JERRY_DEBUGGER_EVAL_RESULT_END:
+                if subtype == JERRY_DEBUGGER_EVAL_ERROR:
+                    message = "Uncaught exception: %s" % (message)
+
+                return DebuggerAction(DebuggerAction.PROMPT, message)
+
+        elif buffer_type == JERRY_DEBUGGER_MEMSTATS_RECEIVE:
+
+            memory_stats = struct.unpack(connect.byte_order + connect.idx_format *5,
+                                         data[3: 3 + 4 *5])
+
+            self.memstats_sampler.add(memory_stats)
+
+            if self.sampler is self.memstats_sampler and self.sampler_requested:
+                return self._finish_sample()
+
+            if self.json_output:
+                event = dict(zip(MEMSTATS_FIELDS, memory_stats))
+                event["event"] = "memstats"
+                return DebuggerAction(DebuggerAction.PROMPT, event=event)
+
+            result = ["Allocated bytes: %d" % (memory_stats[0]),
+                      "Byte code bytes: %d" % (memory_stats[1]),
+                      "String bytes: %d" % (memory_stats[2]),
+                      "Object bytes: %d" % (memory_stats[3]),
+                      "Property bytes: %d" % (memory_stats[4])]
+
+            return DebuggerAction(DebuggerAction.PROMPT, "\n".join(result))
+
+        elif buffer_type == JERRY_DEBUGGER_WAIT_FOR_SOURCE:
+            self.send_client_source()
+
+        else:
+            raise Exception("Unknown message")
+
+        return None
+
+    def _create_hit_action(self, buffer_type, breakpoint):
+        """ Describe the stop of the target at a breakpoint or exception hit """
+        self.last_breakpoint_hit = breakpoint[0]
+        exception_hint = None
+
+        if buffer_type == JERRY_DEBUGGER_EXCEPTION_HIT and self.exception_string:
+            exception_hint = self.exception_string.get_text()
+            self.exception_string.clear()
+
+        if self.json_output:
+            event = {"event": "breakpoint",
+                     "exact": breakpoint[1],
+                     "breakpoint": breakpoint[0].to_dict()}
+            if buffer_type == JERRY_DEBUGGER_EXCEPTION_HIT:
+                event["event"] = "exception"
+                event["hint"] = decode_text(exception_hint)
+            return DebuggerAction(DebuggerAction.PROMPT, event=event)
+
+        result = []
+
+        if buffer_type == JERRY_DEBUGGER_EXCEPTION_HIT:
+            result.append("Exception throw detected (to disable automatic stop type exception 0)")
+            if exception_hint is not None:
+                result.append("Exception hint: %s" % (exception_hint))
+
+        if breakpoint[1]:
+            breakpoint_info = "at"
+        else:
+            breakpoint_info = "around"
+
+        if breakpoint[0].active_index >= 0:
+            breakpoint_info += " breakpoint:%s%d%s" % (self.red, breakpoint[0].active_index, self.nocolor)
+
+        result.append("Stopped %s %s" % (breakpoint_info, breakpoint[0]))
+        if self.display:
+            source = get_source(self, self.display, 0)
+            if source:
+                result.append(source)
+
+        return DebuggerAction(DebuggerAction.PROMPT, "\n".join(result))
+
+    @staticmethod
+    def _create_result_event(buffer_type, subtype, message):
+        """ Describe an eval or output result with a JSON object """
+        message = decode_text(message)
+
+        if buffer_type == JERRY_DEBUGGER_EVAL_RESULT_END:
+            event = {"event": "eval",
+                     "exception": subtype == JERRY_DEBUGGER_EVAL_ERROR,
+                     "result": message}
+            return DebuggerAction(DebuggerAction.PROMPT, event=event)
+
+        levels = {JERRY_DEBUGGER_OUTPUT_OK: "out",
+                  JERRY_DEBUGGER_OUTPUT_DEBUG: "out",
+                  JERRY_DEBUGGER_OUTPUT_WARNING: "warning",
+                  JERRY_DEBUGGER_OUTPUT_ERROR: "err",
+                  JERRY_DEBUGGER_OUTPUT_TRACE: "trace"}
+
+        if subtype not in levels:
+            return None
+
+        event = {"event": "output",
+                 "level": levels[subtype],
+                 "message": message.rstrip("\n")}
+        return DebuggerAction(DebuggerAction.TEXT, event=event)
+
+
+# pylint: disable=too-many-branches,too-many-locals,too-many-statements
+def parse_source(connect, debugger, data):
+    source_code = MessageAccumulator()
+    source = None
+    source_code_name = MessageAccumulator()
+    function_name = MessageAccumulator()
+    stack = [{"line": 1,
+              "column": 1,
+              "name": "",
+              "lines": [],
+              "offsets": []}]
+    new_function_list = {}
+
+    while True:
+        if data is None:
+            return
+
+        buffer_type = ord(data[2])
+        buffer_size = ord(data[1]) - 1
+
+        logging.debug("Parser buffer type: %d, message size: %d", buffer_type, buffer_size)
+
+        if buffer_type == JERRY_DEBUGGER_PARSE_ERROR:
+            logging.error("Parser error!")
+            return
+
+        elif buffer_type in [JERRY_DEBUGGER_SOURCE_CODE, JERRY_DEBUGGER_SOURCE_CODE_END]:
+            source_code.append(data[3:])
+            source = None
+
+        elif buffer_type in [JERRY_DEBUGGER_SOURCE_CODE_NAME, JERRY_DEBUGGER_SOURCE_CODE_NAME_END]:
+            source_code_name.append(data[3:])
+
+        elif buffer_type in [JERRY_DEBUGGER_FUNCTION_NAME, JERRY_DEBUGGER_FUNCTION_NAME_END]:
+            function_name.append(data[3:])
+
+        elif buffer_type == JERRY_DEBUGGER_PARSE_FUNCTION:
+            logging.debug("Source name: %s, function name: %s",
+                          source_code_name.get_text(), function_name.get_text())
+
+            position = struct.unpack(connect.byte_order + connect.idx_format + connect.idx_format,
+                                     data[3: 3 + 4 + 4])
+
+            if source is None:
+                source = JerrySource(source_code.get_text())
+
+            stack.append({"source": source,
+                          "source_name": source_code_name.get_text(),
+                          "line": position[0],
+                          "column": position[1],
+                          "name": function_name.get_text(),
+                          "lines": [],
+                          "offsets": []})
+            function_name.clear()
+
+        elif buffer_type in [JERRY_DEBUGGER_BREAKPOINT_LIST, JERRY_DEBUGGER_BREAKPOINT_OFFSET_LIST]:
+            name = "lines"
+            if buffer_type == JERRY_DEBUGGER_BREAKPOINT_OFFSET_LIST:
+                name = "offsets"
+
+            logging.debug("Breakpoint %s received", name)
+
+            count = buffer_size // 4
+            stack[-1][name].extend(struct.unpack(connect.byte_order + connect.idx_format * count,
+                                                 data[3: 3 + count * 4]))
+
+        elif buffer_type == JERRY_DEBUGGER_BYTE_CODE_CP:
+            byte_code_cp = struct.unpack(connect.byte_order + connect.cp_format,
+                                         data[3: 3 + connect.cp_size])[0]
+
+            logging.debug("Byte code cptr received: {0x%x}", byte_code_cp)
+
+            func_desc = stack.pop()
+
+            # We know the last item in the list is the general byte code.
+            if len(stack) == 0:
+                if source is None:
+                    source = JerrySource(source_code.get_text())
+
+                func_desc["source"] = source
+                func_desc["source_name"] = source_code_name.get_text()
+
+            function = JerryFunction(len(stack) != 0,
                                      byte_code_cp,
                                      func_desc["source"],
                                      func_desc["source_name"],
@@ -780,39 +1636,70 @@ def parse_source(connect, debugger, data):
     # Copy the ready list to the global storage.
     debugger.function_list.update(new_function_list)
 
+    if debugger.coverage is not None:
+        for function in new_function_list.values():
+            debugger.coverage.add_function(debugger, function)
+
     for function in new_function_list.values():
-        for line, breakpoint in function.lines.items():
-            debugger.line_list.insert(line, breakpoint)
+        basename = source_basename(function.source_name)
+        for line in function.lines:
+            debugger.source_line_list.insert((basename, line), function)
 
     # Try to set the pending breakpoints
     if debugger.pending_breakpoint_list:
         logging.debug("Pending breakpoints list: %s", debugger.pending_breakpoint_list)
-        bp_list = debugger.pending_breakpoint_list
+        resolve_pending_breakpoints(debugger, new_function_list)
 
-        for breakpoint_index, breakpoint in bp_list.items():
-            for src in debugger.function_list.values():
-                if src.source_name == breakpoint.source_name:
-                    source_lines = len(src.source)
-                else:
-                    source_lines = 0
-
-            if breakpoint.line:
-                if breakpoint.line <= source_lines:
-                    command = breakpoint.source_name + ":" + str(breakpoint.line)
-                    if set_breakpoint(debugger, command, True):
-                        del bp_list[breakpoint_index]
-            elif breakpoint.function:
-                command = breakpoint.function
-                if set_breakpoint(debugger, command, True):
-                    del bp_list[breakpoint_index]
-
-        if not bp_list:
+        if not debugger.pending_breakpoint_list:
             debugger.send_parser_config(0)
 
     else:
         logging.debug("No pending breakpoints")
 
 
+def resolve_pending_breakpoints(debugger, new_function_list):
+    # Only the new functions are checked, since the pending breakpoints
+    # did not match any function which was registered before.
+    resolved = {}
+
+    for function in new_function_list.values():
+        for breakpoint in debugger.pending_source_list.get(source_basename(function.source_name)):
+            if (function.has_line(breakpoint.line)
+                    and source_name_matches(breakpoint.source_name, function.source_name)):
+                resolved[breakpoint.index] = breakpoint
+
+        for breakpoint in debugger.pending_function_list.get(function.name):
+            resolved[breakpoint.index] = breakpoint
+
+    for breakpoint_index in sorted(resolved):
+        breakpoint = resolved[breakpoint_index]
+
+        if breakpoint.line:
+            command = breakpoint.source_name + ":" + str(breakpoint.line)
+        else:
+            command = breakpoint.function
+
+        if set_breakpoint(debugger, command, True):
+            debugger.remove_pending_breakpoint(breakpoint_index)
+
+
+def decode_text(text):
+    """ Decode a string received from the engine, invalid sequences are replaced """
+    if text is None:
+        return None
+    return text.decode("utf-8", "replace")
+
+
+def source_basename(source_name):
+    return source_name[max(source_name.rfind("/"), source_name.rfind("\\")) + 1:]
+
+
+def source_name_matches(source_name, func_source):
+    return (source_name == func_source or
+            func_source.endswith("/" + source_name) or
+            func_source.endswith("\\" + source_name))
+
+
 def src_check_args(args):
     try:
         line_num = int(args)
@@ -826,38 +1713,47 @@ def src_check_args(args):
         return -1
 
 
-def print_source(debugger, line_num, offset):
+def get_source(debugger, line_num, offset):
     last_bp = debugger.last_breakpoint_hit
     if not last_bp:
-        return
+        return None
 
-    lines = last_bp.function.source
+    lines = last_bp.function.source.get_lines()
+    result = []
     if last_bp.function.source_name:
-        print("Source: %s" % (last_bp.function.source_name))
+        result.append("Source: %s" % (last_bp.function.source_name))
 
     if line_num == 0:
         start = 0
-        end = len(last_bp.function.source)
+        end = len(lines)
     else:
         start = max(last_bp.line - line_num, 0)
-        end = min(last_bp.line + line_num - 1, len(last_bp.function.source))
+        end = min(last_bp.line + line_num - 1, len(lines))
         if offset:
             if start + offset < 0:
                 debugger.src_offset += debugger.src_offset_diff
                 offset += debugger.src_offset_diff
-            elif end + offset > len(last_bp.function.source):
+            elif end + offset > len(lines):
                 debugger.src_offset -= debugger.src_offset_diff
                 offset -= debugger.src_offset_diff
 
             start = max(start + offset, 0)
-            end = min(end + offset, len(last_bp.function.source))
+            end = min(end + offset, len(lines))
 
     for i in range(start, end):
         if i == last_bp.line - 1:
-            print("%s%4d%s %s>%s %s" % (debugger.green, i + 1, debugger.nocolor, debugger.red, \
-                                        debugger.nocolor, lines[i]))
+            result.append("%s%4d%s %s>%s %s" % (debugger.green, i + 1, debugger.nocolor, debugger.red, \
+                                                debugger.nocolor, lines[i]))
         else:
-            print("%s%4d%s   %s" % (debugger.green, i + 1, debugger.nocolor, lines[i]))
+            result.append("%s%4d%s   %s" % (debugger.green, i + 1, debugger.nocolor, lines[i]))
+
+    return "\n".join(result)
+
+
+def print_source(debugger, line_num, offset):
+    source = get_source(debugger, line_num, offset)
+    if source:
+        print(source)
 
 
 def release_function(connect, debugger, data):
@@ -865,9 +1761,12 @@ def release_function(connect, debugger, data):
                                  data[3: 3 + connect.cp_size])[0]
 
     function = debugger.function_list[byte_code_cp]
+    basename = source_basename(function.source_name)
 
-    for line, breakpoint in function.lines.items():
-        debugger.line_list.delete(line, breakpoint)
+    for line in function.lines:
+        debugger.source_line_list.delete((basename, line), function)
+
+    for breakpoint in function.breakpoints.values():
         if breakpoint.active_index >= 0:
             del debugger.active_breakpoint_list[breakpoint.active_index]
 
@@ -883,8 +1782,9 @@ def enable_breakpoint(debugger, breakpoint):
         if not debugger.breakpoint_pending_exists(breakpoint):
             debugger.next_breakpoint_index += 1
             breakpoint.index = debugger.next_breakpoint_index
-            debugger.pending_breakpoint_list[debugger.next_breakpoint_index] = breakpoint
+            debugger.insert_pending_breakpoint(breakpoint)
             print("%sPending breakpoint%s at %s" % (debugger.yellow, debugger.nocolor, breakpoint))
+            debugger.report_event({"event": "break", "breakpoint": breakpoint.to_dict()})
         else:
             print("%sPending breakpoint%s already exists" % (debugger.yellow, debugger.nocolor))
 
@@ -896,37 +1796,42 @@ def enable_breakpoint(debugger, breakpoint):
             debugger.send_breakpoint(breakpoint)
 
         print("%sBreakpoint %d %sat %s" % (debugger.green, breakpoint.active_index, debugger.nocolor, breakpoint))
+        debugger.report_event({"event": "break", "breakpoint": breakpoint.to_dict()})
 
 
 def set_breakpoint(debugger, string, pending):
+    """ Enable the breakpoints of the location and return them, the list is empty if nothing is found """
     line = re.match("(.*):(\\d+)$", string)
-    found = False
+    breakpoints = []
 
     if line:
         source_name = line.group(1)
         new_line = int(line.group(2))
 
-        for breakpoint in debugger.line_list.get(new_line):
-            func_source = breakpoint.function.source_name
-            if (source_name == func_source or
-                    func_source.endswith("/" + source_name) or
-                    func_source.endswith("\\" + source_name)):
-
-                enable_breakpoint(debugger, breakpoint)
-                found = True
+        for function in debugger.source_line_list.get((source_basename(source_name), new_line)):
+            if source_name_matches(source_name, function.source_name):
+                breakpoints.append(function.get_line_breakpoint(new_line))
 
     else:
         for function in debugger.function_list.values():
             if function.name == string:
-                enable_breakpoint(debugger, function.lines[function.first_breakpoint_line])
-                found = True
+                breakpoints.append(function.get_line_breakpoint(function.first_breakpoint_line))
+
+    for breakpoint in breakpoints:
+        enable_breakpoint(debugger, breakpoint)
 
-    if not found and not pending:
-        print("No breakpoint found, do you want to add a %spending breakpoint%s? (y or [n])" % \
-              (debugger.yellow, debugger.nocolor))
+    if not breakpoints and not pending:
+        if debugger.add_pending_breakpoints is None:
+            print("No breakpoint found, do you want to add a %spending breakpoint%s? (y or [n])" % \
+                  (debugger.yellow, debugger.nocolor))
+
+            add_pending = sys.stdin.readline() in ['yes\n', 'y\n']
+        else:
+            add_pending = debugger.add_pending_breakpoints
+            if not add_pending:
+                print("No breakpoint found")
 
-        ans = sys.stdin.readline()
-        if ans in ['yes\n', 'y\n']:
+        if add_pending:
             if not debugger.pending_breakpoint_list:
                 debugger.send_parser_config(1)
 
@@ -935,42 +1840,80 @@ def set_breakpoint(debugger, string, pending):
             else:
                 breakpoint = JerryPendingBreakpoint(function=string)
             enable_breakpoint(debugger, breakpoint)
+            breakpoints.append(breakpoint)
 
-    elif not found and pending:
-        return False
-
-    return True
+    return breakpoints
 
 
 def get_breakpoint(debugger, breakpoint_data):
     function = debugger.function_list[breakpoint_data[0]]
     offset = breakpoint_data[1]
 
-    if offset in function.offsets:
-        return (function.offsets[offset], True)
+    index = bisect.bisect_right(function.offsets, offset) - 1
+
+    if index >= 0 and function.offsets[index] == offset:
+        return (function.get_breakpoint(offset), True)
 
     if offset < function.first_breakpoint_offset:
-        return (function.offsets[function.first_breakpoint_offset], False)
+        return (function.get_breakpoint(function.first_breakpoint_offset), False)
 
-    nearest_offset = -1
+    return (function.get_breakpoint(function.offsets[index]), False)
 
-    for current_offset in function.offsets:
-        if current_offset <= offset and current_offset > nearest_offset:
-            nearest_offset = current_offset
 
-    return (function.offsets[nearest_offset], False)
+def print_action(debugger, action):
+    if action.event is not None:
+        debugger.report_event(action.event)
+    elif action.text is not None:
+        print(action.text)
 
 
-# pylint: disable=too-many-branches,too-many-locals,too-many-statements
-def main():
-    args = arguments_parse()
-    connect = Connect(args.address)
+def replay(debugger):
+    """ Process the recorded messages without user interaction """
+    while True:
+        action = debugger.process_messages()
+
+        if action.type == DebuggerAction.END:
+            return
+
+        print_action(debugger, action)
+
+
+def create_event_printer(output):
+    """ Return an event handler which prints the events as JSON objects, one per line """
+    def print_event(event):
+        output.write(json.dumps(event, sort_keys=True) + "\n")
+        output.flush()
+
+    return print_event
+
+
+def create_debugger(connect, args, event_handler):
     debugger = JerryDebugger(connect)
-    exception_string = ""
+    debugger.json_output = args.json
+    debugger.event_handler = event_handler
 
     if args.color:
         debugger.set_colors()
 
+    return debugger
+
+
+def main():
+    args = arguments_parse()
+    event_handler = None
+
+    if args.json:
+        # Only the events are printed to stdout, every other text goes to stderr.
+        event_handler = create_event_printer(sys.stdout)
+        sys.stdout = sys.stderr
+
+    if args.replay is not None:
+        replay(create_debugger(ReplayConnect(args.replay), args, event_handler))
+        return
+
+    connect = Connect(args.address, args.record)
+    debugger = create_debugger(connect, args, event_handler)
+
     non_interactive = args.non_interactive
 
     logging.debug("Connected to JerryScript on %d port", connect.port)
@@ -985,194 +1928,65 @@ def main():
     if args.exception is not None:
         prompt.do_exception(str(args.exception))
 
-    if args.client_source is not None:
-        prompt.store_client_sources(args.client_source)
-
-    while True:
-        if not non_interactive and prompt.cont:
-            if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                sys.stdin.readline()
-                prompt.cont = False
-                debugger.send_command(JERRY_DEBUGGER_STOP)
-
-        data = connect.get_message(False)
-
-        if data == b'':
-            continue
-
-        if not data:  # Break the while loop if there is no more data.
-            break
-
-        buffer_type = ord(data[2])
-        buffer_size = ord(data[1]) - 1
-
-        logging.debug("Main buffer type: %d, message size: %d", buffer_type, buffer_size)
-
-        if buffer_type in [JERRY_DEBUGGER_PARSE_ERROR,
-                           JERRY_DEBUGGER_BYTE_CODE_CP,
-                           JERRY_DEBUGGER_PARSE_FUNCTION,
-                           JERRY_DEBUGGER_BREAKPOINT_LIST,
-                           JERRY_DEBUGGER_SOURCE_CODE,
-                           JERRY_DEBUGGER_SOURCE_CODE_END,
-                           JERRY_DEBUGGER_SOURCE_CODE_NAME,
-                           JERRY_DEBUGGER_SOURCE_CODE_NAME_END,
-                           JERRY_DEBUGGER_FUNCTION_NAME,
-                           JERRY_DEBUGGER_FUNCTION_NAME_END]:
-            parse_source(connect, debugger, data)
-
-        elif buffer_type == JERRY_DEBUGGER_WAITING_AFTER_PARSE:
-            debugger.send_command(JERRY_DEBUGGER_PARSER_RESUME)
-
-        elif buffer_type == JERRY_DEBUGGER_RELEASE_BYTE_CODE_CP:
-            release_function(connect, debugger, data)
+    if args.client_source:
+        debugger.store_client_sources(args.client_source)
 
-        elif buffer_type in [JERRY_DEBUGGER_BREAKPOINT_HIT, JERRY_DEBUGGER_EXCEPTION_HIT]:
-            breakpoint_data = struct.unpack(connect.byte_order + connect.cp_format + connect.idx_format, data[3:])
+    if args.memstats_sample is not None:
+        debugger.memstats_sampler.start(args.memstats_sample)
 
-            breakpoint = get_breakpoint(debugger, breakpoint_data)
-            debugger.last_breakpoint_hit = breakpoint[0]
+    if args.profile is not None:
+        debugger.profiler.start(1.0 / args.profile)
 
-            if buffer_type == JERRY_DEBUGGER_EXCEPTION_HIT:
-                print("Exception throw detected (to disable automatic stop type exception 0)")
-                if exception_string:
-                    print("Exception hint: %s" % (exception_string))
-                    exception_string = ""
+    if args.coverage is not None:
+        debugger.coverage = Coverage()
+        debugger.send_parser_config(1)
 
-            if breakpoint[1]:
-                breakpoint_info = "at"
-            else:
-                breakpoint_info = "around"
+    while not prompt.quit:
+        action = debugger.process_messages()
 
-            if breakpoint[0].active_index >= 0:
-                breakpoint_info += " breakpoint:%s%d%s" % (debugger.red, breakpoint[0].active_index, debugger.nocolor)
+        if action.type == DebuggerAction.END:
+            break
 
-            print("Stopped %s %s" % (breakpoint_info, breakpoint[0]))
-            if debugger.display:
-                print_source(prompt.debugger, debugger.display, 0)
+        print_action(debugger, action)
 
+        if action.type == DebuggerAction.PROMPT:
             if debugger.repeats_remain:
                 prompt.do_next(debugger.repeats_remain)
                 time.sleep(0.1)
             else:
                 prompt.cmdloop()
 
-            if prompt.quit:
-                break
-
-        elif buffer_type == JERRY_DEBUGGER_EXCEPTION_STR:
-            exception_string += data[3:]
-
-        elif buffer_type == JERRY_DEBUGGER_EXCEPTION_STR_END:
-            exception_string += data[3:]
-
-        elif buffer_type in [JERRY_DEBUGGER_BACKTRACE, JERRY_DEBUGGER_BACKTRACE_END]:
-            frame_index = 0
-
-            while True:
-
-                buffer_pos = 3
-                while buffer_size > 0:
-                    breakpoint_data = struct.unpack(connect.byte_order + connect.cp_format + connect.idx_format,
-                                                    data[buffer_pos: buffer_pos + connect.cp_size + 4])
+        elif action.type == DebuggerAction.WAIT:
+            # Sleep until the target sends data, the user presses enter or a sample is due.
+            inputs = [connect.client_socket]
+            if not non_interactive and prompt.cont:
+                inputs.append(sys.stdin)
 
-                    breakpoint = get_breakpoint(debugger, breakpoint_data)
+            timeout = None
+            if prompt.cont:
+                timeout = debugger.get_sample_timeout()
 
-                    print("Frame %d: %s" % (frame_index, breakpoint[0]))
+            ready = select.select(inputs, [], [], timeout)[0]
 
-                    frame_index += 1
-                    buffer_pos += 6
-                    buffer_size -= 6
-
-                if buffer_type == JERRY_DEBUGGER_BACKTRACE_END:
-                    break
-
-                data = connect.get_message(True)
-                buffer_type = ord(data[2])
-                buffer_size = ord(data[1]) - 1
-
-                if buffer_type not in [JERRY_DEBUGGER_BACKTRACE,
-                                       JERRY_DEBUGGER_BACKTRACE_END]:
-                    raise Exception("Backtrace data expected")
-
-            prompt.cmdloop()
-
-
-        elif buffer_type in [JERRY_DEBUGGER_EVAL_RESULT,
-                             JERRY_DEBUGGER_EVAL_RESULT_END,
-                             JERRY_DEBUGGER_OUTPUT_RESULT,
-                             JERRY_DEBUGGER_OUTPUT_RESULT_END]:
-            message = b""
-            msg_type = buffer_type
-            while True:
-                if buffer_type in [JERRY_DEBUGGER_EVAL_RESULT_END,
-                                   JERRY_DEBUGGER_OUTPUT_RESULT_END]:
-                    subtype = ord(data[-1])
-                    message += data[3:-1]
-                    break
-                else:
-                    message += data[3:]
-
-                data = connect.get_message(True)
-                buffer_type = ord(data[2])
-                buffer_size = ord(data[1]) - 1
-                # Checks if the next frame would be an invalid data frame.
-                # If it is not the message type, or the end type of it, an exception is thrown.
-                if buffer_type not in [msg_type, msg_type + 1]:
-                    raise Exception("Invalid data caught")
-
-            # Subtypes of output
-            if buffer_type == JERRY_DEBUGGER_OUTPUT_RESULT_END:
-                message = message.rstrip('\n')
-                if subtype in [JERRY_DEBUGGER_OUTPUT_OK,
-                               JERRY_DEBUGGER_OUTPUT_DEBUG]:
-                    print("%sout: %s%s" % (debugger.blue, debugger.nocolor, message))
-                elif subtype == JERRY_DEBUGGER_OUTPUT_WARNING:
-                    print("%swarning: %s%s" % (debugger.yellow, debugger.nocolor, message))
-                elif subtype == JERRY_DEBUGGER_OUTPUT_ERROR:
-                    print("%serr: %s%s" % (debugger.red, debugger.nocolor, message))
-                elif subtype == JERRY_DEBUGGER_OUTPUT_TRACE:
-                    print("%strace: %s%s" % (debugger.blue, debugger.nocolor, message))
-
-            # Subtypes of eval
-            elif buffer_type == JERRY_DEBUGGER_EVAL_RESULT_END:
-                if subtype == JERRY_DEBUGGER_EVAL_ERROR:
-                    print("Uncaught exception: %s" % (message))
-                else:
-                    print(message)
-
-                prompt.cmdloop()
-
-        elif buffer_type == JERRY_DEBUGGER_MEMSTATS_RECEIVE:
-
-            memory_stats = struct.unpack(connect.byte_order + connect.idx_format *5,
-                                         data[3: 3 + 4 *5])
-
-            print("Allocated bytes: %d" % (memory_stats[0]))
-            print("Byte code bytes: %d" % (memory_stats[1]))
-            print("String bytes: %d" % (memory_stats[2]))
-            print("Object bytes: %d" % (memory_stats[3]))
-            print("Property bytes: %d" % (memory_stats[4]))
-
-            prompt.cmdloop()
+            if sys.stdin in ready:
+                sys.stdin.readline()
+                prompt.cont = False
+                debugger.stop()
+            elif not ready:
+                debugger.sample()
 
-        elif buffer_type == JERRY_DEBUGGER_WAIT_FOR_SOURCE:
-            prompt.send_client_source()
+    if args.memstats_export is not None:
+        count = debugger.memstats_sampler.export(args.memstats_export)
+        print("%d memory statistics samples exported to %s" % (count, args.memstats_export))
 
+    if args.profile_export is not None:
+        count = debugger.profiler.export(args.profile_export)
+        print("%d profiled stacks exported to %s" % (count, args.profile_export))
 
-        else:
-            raise Exception("Unknown message")
+    if args.coverage is not None:
+        count = debugger.coverage.export(args.coverage)
+        print("Coverage of %d sources exported to %s" % (count, args.coverage))
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except socket.error as error_msg:
-        ERRNO = error_msg.errno
-        MSG = str(error_msg)
-
-        if ERRNO == 111:
-            sys.exit("Failed to connect to the JerryScript debugger.")
-        elif ERRNO == 32 or ERRNO == 104:
-            sys.exit("Connection closed.")
-        else:
-            sys.exit("Failed to connect to the JerryScript debugger.\nError: %s" % (MSG))
\ No newline at end of file
+    run_client(main)
@@ -0,0 +1,75 @@
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Helpers shared by the debugger client front-ends """
+
+import logging
+import socket
+import sys
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+def add_common_arguments(parser):
+    """ Add the options which every debugger client accepts """
+    parser.add_argument("-v", "--verbose", action="store_true", default=False,
+                        help="increase verbosity (default: %(default)s)")
+    parser.add_argument("--non-interactive", action="store_true", default=False,
+                        help="disable stop when newline is pressed (default: %(default)s)")
+    parser.add_argument("--color", action="store_true", default=False,
+                        help="enable color highlighting on source commands (default: %(default)s)")
+    parser.add_argument("--exception", action="store", default=None, type=int, choices=[0, 1],
+                        help="set exception config, usage 1: [Enable] or 0: [Disable]")
+
+
+def parse_arguments(parser):
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.DEBUG)
+        logging.debug("Debug logging mode: ON")
+
+    return args
+
+
+def capture_output(function, *args):
+    """ Call the function and return its result and everything it printed """
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        result = function(*args)
+        text = sys.stdout.getvalue()
+    finally:
+        sys.stdout = stdout
+
+    return result, text
+
+
+def run_client(main):
+    """ Run the main function of a client and report the connection errors """
+    try:
+        main()
+    except socket.error as error_msg:
+        errno = error_msg.errno
+        msg = str(error_msg)
+
+        if errno == 111:
+            sys.exit("Failed to connect to the JerryScript debugger.")
+        elif errno == 32 or errno == 104:
+            sys.exit("Connection closed.")
+        else:
+            sys.exit("Failed to connect to the JerryScript debugger.\nError: %s" % (msg))
@@ -1,7 +1,9 @@
+from __future__ import print_function
 import logging
 import select
 import socket
 import struct
+import time
 
 # Messages sent by the server to client.
 JERRY_DEBUGGER_CONFIGURATION = 1
@@ -9,52 +11,83 @@ JERRY_DEBUGGER_CONFIGURATION = 1
 # Expected debugger protocol version.
 JERRY_DEBUGGER_VERSION = 3
 
-MAX_BUFFER_SIZE = 128
+# Size of the preallocated receive buffer. The socket is read in chunks
+# as large as the free space of this buffer.
+MAX_BUFFER_SIZE = 65536
+# Frames sent by the engine consist of a two byte header and at most 125 bytes of payload.
+MAX_FRAME_SIZE = 2 + 125
 WEBSOCKET_BINARY_FRAME = 2
 WEBSOCKET_FIN_BIT = 0x80
 
-class Connect(object):
-    def __init__(self, address):
-
-        if ":" not in address:
-            self.host = address
-            self.port = 5001  # use default port
-        else:
-            self.host, self.port = address.split(":")
-            self.port = int(self.port)
-
-        print("Connecting to: %s:%s" % (self.host, self.port))
-
-        self.message_data = b""
-        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.client_socket.connect((self.host, self.port))
+# Session logs start with this magic, followed by records of a header:
+# time since the start [double], direction [1], size [4] and the data.
+RECORD_MAGIC = b"JERRYDBGLOG1"
+RECORD_HEADER = "<dBI"
+RECORD_RECEIVE = 0
+RECORD_SEND = 1
+
+class FrameBuffer(object):
+    """ Splits the stream received from the target into frames
+
+    The received data is stored in a buffer between read_pos and write_pos. Frames
+    are returned as memoryview slices of this buffer, so they are only valid until
+    the next get_message call. The subclasses fill the buffer by _receive, report
+    pending data by _can_receive and send the messages by send_message.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, data, size=0):
+        self.buffer = data
+        self.buffer_view = memoryview(self.buffer)
+        self.read_pos = 0
+        self.write_pos = size
+        self.closed = False
+
+        # Filled by the configuration message of the handshake.
+        self.max_message_size = 0
+        self.cp_size = 0
+        self.little_endian = 0
+        self.version = 0
+        self.byte_order = "<"
+        self.cp_format = "I"
+        self.idx_format = "I"
 
+    def send_message(self, message):
+        raise NotImplementedError()
+
+    def _receive(self):
+        """ Append the next chunk of the stream to the buffer, returns False at the end of the stream """
+        raise NotImplementedError()
+
+    def _can_receive(self):
+        """ Return True if the stream has data which can be read without blocking """
+        raise NotImplementedError()
+
+    def _compact(self):
+        """ Make room at the end of the buffer by dropping the data which has been read """
+        if self.read_pos == self.write_pos:
+            self.read_pos = 0
+            self.write_pos = 0
+        elif self.write_pos > len(self.buffer) // 2:
+            # Only an incomplete frame is kept, so moving it to the start is cheap.
+            unread = self.write_pos - self.read_pos
+            self.buffer[0:unread] = self.buffer_view[self.read_pos:self.write_pos].tobytes()
+            self.read_pos = 0
+            self.write_pos = unread
+
+    def _handshake(self):
         self.send_message(b"GET /jerry-debugger HTTP/1.1\r\n" +
                           b"Upgrade: websocket\r\n" +
                           b"Connection: Upgrade\r\n" +
                           b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n")
-        result = b""
         expected = (b"HTTP/1.1 101 Switching Protocols\r\n" +
                     b"Upgrade: websocket\r\n" +
                     b"Connection: Upgrade\r\n" +
                     b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n\r\n")
 
-        len_expected = len(expected)
-
-        while len(result) < len_expected:
-            result += self.client_socket.recv(1024)
-
-        len_result = len(result)
-
-        if result[0:len_expected] != expected:
+        if self._receive_bytes(len(expected)) != expected:
             raise Exception("Unexpected handshake")
 
-        if len_result > len_expected:
-            result = result[len_expected:]
-        else:
-            result = b""
-
-        len_expected = 7
         # Network configurations, which has the following struct:
         # header [2] - opcode[1], size[1]
         # type [1]
@@ -62,11 +95,7 @@ class Connect(object):
         # cpointer_size [1]
         # little_endian [1]
         # version [1]
-
-        while len(result) < len_expected:
-            result += self.client_socket.recv(1024)
-
-        len_result = len(result)
+        result = self._receive_bytes(7)
 
         expected = struct.pack("BBB",
                                WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
@@ -102,48 +131,180 @@ class Connect(object):
 
         logging.debug("Compressed pointer size: %d", self.cp_size)
 
-        if len_result > len_expected:
-            self.message_data = result[len_expected:]
+    def _receive_bytes(self, size):
+        """ Return the next size bytes of the stream as a string """
+        while self.write_pos - self.read_pos < size:
+            if not self._receive():
+                raise Exception("Connection closed")
+
+        result = self.buffer_view[self.read_pos:self.read_pos + size].tobytes()
+        self.read_pos += size
+        return result
+
+    def _next_frame(self):
+        """ Return the next complete frame of the buffer or None """
+        if self.write_pos - self.read_pos < 2:
+            return None
+
+        if self.buffer[self.read_pos] != WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT:
+            raise Exception("Unexpected data frame")
+
+        size = self.buffer[self.read_pos + 1]
+        if size == 0 or size >= 126:
+            raise Exception("Unexpected data frame")
+
+        end = self.read_pos + size + 2
+        if end > self.write_pos:
+            return None
+
+        result = self.buffer_view[self.read_pos:end]
+        self.read_pos = end
+        return result
+
+    def get_message(self, blocking):
+        while True:
+            result = self._next_frame()
+            if result is not None:
+                return result
+
+            # Connection was closed
+            if self.closed:
+                return None
+
+            if not blocking and not self._can_receive():
+                return b''
+
+            if not self._receive():
+                return None
+
+    def iter_messages(self):
+        """ Yield every complete frame which is available without blocking
+
+        The frames already in the buffer are returned first. The socket is only checked
+        (once) when the buffer has no complete frame, so the buffer is never compacted
+        while complete frames are pending. Frames are taken from the buffer one by one,
+        so frames consumed by nested get_message calls are not returned again.
+        """
+        checked = False
+
+        while True:
+            result = self._next_frame()
+            if result is not None:
+                yield result
+                continue
+
+            if checked or self.closed:
+                return
+
+            checked = True
+            if not self._can_receive():
+                return
+
+            self._receive()
+
+
+class Connect(FrameBuffer):
+    def __init__(self, address, record=None):
+        FrameBuffer.__init__(self, bytearray(MAX_BUFFER_SIZE))
+
+        if ":" not in address:
+            self.host = address
+            self.port = 5001  # use default port
+        else:
+            self.host, self.port = address.split(":")
+            self.port = int(self.port)
+
+        print("Connecting to: %s:%s" % (self.host, self.port))
+
+        # Every received chunk and sent message is appended to the record file.
+        self.record_file = None
+        self.record_start = time.time()
+        if record is not None:
+            self.record_file = open(record, "wb")
+            self.record_file.write(RECORD_MAGIC)
+
+        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.client_socket.connect((self.host, self.port))
+
+        self._handshake()
 
     def __del__(self):
         self.client_socket.close()
+        if self.record_file is not None:
+            self.record_file.close()
+
+    def _record(self, direction, data):
+        self.record_file.write(struct.pack(RECORD_HEADER, time.time() - self.record_start, direction, len(data)))
+        self.record_file.write(data)
 
     def send_message(self, message):
-        size = len(message)
-        while size > 0:
-            bytes_send = self.client_socket.send(message)
-            if bytes_send < size:
-                message = message[bytes_send:]
-            size -= bytes_send
+        if self.record_file is not None:
+            self._record(RECORD_SEND, message)
 
-    def get_message(self, blocking):
-        # Connection was closed
-        if self.message_data is None:
-            return None
+        # The whole message is passed to the kernel at once, large messages
+        # (e.g. a client source split into many frames) need only a few writes.
+        self.client_socket.sendall(message)
 
-        while True:
-            if len(self.message_data) >= 2:
-                if ord(self.message_data[0]) != WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT:
-                    raise Exception("Unexpected data frame")
+    def _receive(self):
+        """ Read the next chunk of the stream into the free space of the buffer """
+        self._compact()
 
-                size = ord(self.message_data[1])
-                if size == 0 or size >= 126:
-                    raise Exception("Unexpected data frame")
+        size = self.client_socket.recv_into(self.buffer_view[self.write_pos:])
 
-                if len(self.message_data) >= size + 2:
-                    result = self.message_data[0:size + 2]
-                    self.message_data = self.message_data[size + 2:]
-                    return result
+        if not size:
+            self.closed = True
+            return False
 
-            if not blocking:
-                select_result = select.select([self.client_socket], [], [], 0)[0]
-                if self.client_socket not in select_result:
-                    return b''
+        if self.record_file is not None:
+            self._record(RECORD_RECEIVE, self.buffer_view[self.write_pos:self.write_pos + size])
 
-            data = self.client_socket.recv(MAX_BUFFER_SIZE)
+        self.write_pos += size
+        return True
 
-            if not data:
-                self.message_data = None
-                return None
+    def _can_receive(self):
+        return self.client_socket in select.select([self.client_socket], [], [], 0)[0]
+
+
+class ReplayConnect(FrameBuffer):
+    """ Replays the messages received in a recorded session
+
+    The whole received stream is loaded into the buffer, so the frames are
+    processed at full speed. Sent messages are dropped.
+    """
+
+    def __init__(self, path):
+        print("Replaying: %s" % (path))
+
+        with open(path, "rb") as record_file:
+            data = record_file.read()
+
+        if not data.startswith(RECORD_MAGIC):
+            raise Exception("Unexpected session log")
+
+        stream = bytearray()
+        header_size = struct.calcsize(RECORD_HEADER)
+        position = len(RECORD_MAGIC)
+        self.duration = 0
+
+        while position < len(data):
+            self.duration, direction, size = struct.unpack(RECORD_HEADER, data[position:position + header_size])
+            position += header_size
+            if direction == RECORD_RECEIVE:
+                stream += data[position:position + size]
+            position += size
+
+        FrameBuffer.__init__(self, stream, len(stream))
+        # Nothing else arrives, the remaining frames are read from the buffer.
+        self.closed = True
+
+        self._handshake()
+        logging.debug("Replaying %d bytes received in %.3f s", len(stream), self.duration)
+
+    def send_message(self, message):
+        pass
+
+    def _receive(self):
+        return False
 
-            self.message_data += data
+    def _can_receive(self):
+        return False
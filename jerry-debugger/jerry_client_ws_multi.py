@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+from cmd import Cmd
+import argparse
+import select
+import sys
+
+from jerry_client_ws import DebuggerAction, DebuggerPrompt, JerryDebugger, JERRY_DEBUGGER_STOP
+from jerry_client_ws_common import add_common_arguments, capture_output, parse_arguments, run_client
+from jerry_client_ws_con import Connect
+
+
+def arguments_parse():
+    parser = argparse.ArgumentParser(description="JerryScript multi-target debugger client")
+
+    parser.add_argument("address", action="store", nargs="+",
+                        help="specify the network addresses of the targets")
+    add_common_arguments(parser)
+    parser.add_argument("--pending", action="store_true", default=False,
+                        help="add a pending breakpoint when a breakpoint is not found on a target "
+                        "(default: %(default)s)")
+
+    return parse_arguments(parser)
+
+
+class DebuggerTarget(object):
+    """ A JerryScript engine driven by the session manager """
+
+    def __init__(self, index, address):
+        self.index = index
+        self.connect = Connect(address)
+        self.debugger = JerryDebugger(self.connect)
+        self.prompt = DebuggerPrompt(self.debugger, self.connect)
+        self.prompt.non_interactive = True
+        self.running = True
+        self.closed = False
+        self.output = []
+
+    def _capture(self, function, *args):
+        """ Call the function and store everything it prints """
+        result, text = capture_output(function, *args)
+        if text:
+            self.output.append(text.rstrip("\n"))
+        return result
+
+    def execute(self, line):
+        """ Execute a prompt command on the target """
+        self.prompt.stop = False
+        self.prompt.cont = False
+        self._capture(self.prompt.onecmd, line)
+
+        if self.prompt.quit:
+            # The target runs to completion without the debugger.
+            self.connect.client_socket.close()
+            self.running = False
+            self.closed = True
+        elif self.prompt.stop:
+            self.running = True
+
+    def process(self):
+        """ Process the received messages until the target stops or more data is needed """
+        while self.running:
+            action = self._capture(self.debugger.process_messages)
+
+            if action.type == DebuggerAction.END:
+                self.running = False
+                self.closed = True
+                return
+
+            if action.type == DebuggerAction.WAIT:
+                return
+
+            if action.text is not None:
+                self.output.append(action.text)
+
+            if action.type == DebuggerAction.PROMPT:
+                if self.debugger.repeats_remain:
+                    self._capture(self.prompt.do_next, self.debugger.repeats_remain)
+                else:
+                    self.running = False
+
+    def take_output(self):
+        """ Return the lines printed since the last call """
+        lines = [line for text in self.output for line in text.split("\n")]
+        del self.output[:]
+        return lines
+
+    def __str__(self):
+        if self.closed:
+            state = "closed"
+        elif self.running:
+            state = "running"
+        else:
+            state = "stopped"
+        return "%d: %s:%d (%s)" % (self.index, self.connect.host, self.connect.port, state)
+
+
+class SessionManager(object):
+    """ Drives many debugger targets from a single event loop
+
+    Commands are routed to the selected target or broadcast to all targets,
+    and the results are collected per target. """
+
+    def __init__(self, interactive):
+        self.targets = []
+        self.selected = None
+        self.interactive = interactive
+
+    def add_target(self, address):
+        target = DebuggerTarget(len(self.targets), address)
+        self.targets.append(target)
+        if self.selected is None:
+            self.selected = target
+        return target
+
+    def select(self, index):
+        if index < 0 or index >= len(self.targets):
+            raise ValueError(index)
+        self.selected = self.targets[index]
+        return self.selected
+
+    def execute(self, line, broadcast=False):
+        """ Execute the command on the selected target or on all targets which are still connected """
+        targets = self.targets if broadcast else [self.selected]
+        targets = [target for target in targets if not target.closed]
+
+        for target in targets:
+            target.execute(line)
+
+        return self.wait(targets)
+
+    def wait(self, targets=None):
+        """ Process messages until the targets are stopped or closed and return their output """
+        if targets is None:
+            targets = self.targets
+
+        while True:
+            running = []
+            for target in targets:
+                target.process()
+                if target.running:
+                    running.append(target)
+
+            if not running:
+                break
+
+            inputs = [target.connect.client_socket for target in running]
+            if self.interactive:
+                inputs.append(sys.stdin)
+
+            if sys.stdin in select.select(inputs, [], [])[0]:
+                sys.stdin.readline()
+                for target in running:
+                    target.debugger.send_command(JERRY_DEBUGGER_STOP)
+
+        return [(target, target.take_output()) for target in targets]
+
+
+class MultiTargetPrompt(Cmd):
+
+    def __init__(self, manager):
+        Cmd.__init__(self)
+        self.manager = manager
+        self.prompt = "(jerry-multi) "
+
+    def precmd(self, line):
+        if not self.manager.interactive:
+            print("%s" % line)
+        return line
+
+    @staticmethod
+    def print_results(results):
+        for target, lines in results:
+            for line in lines:
+                print("[%d] %s" % (target.index, line))
+
+    def do_targets(self, _):
+        """ List the targets """
+        for target in self.manager.targets:
+            marker = "*" if target is self.manager.selected else " "
+            print("%s%s" % (marker, target))
+
+    def do_target(self, args):
+        """ Select the target which receives the commands """
+        try:
+            target = self.manager.select(int(args))
+        except ValueError:
+            print("Error: Target index expected: %s" % (args))
+            return
+
+        print("Selected target %s" % (target))
+
+    def do_all(self, args):
+        """ Execute a command on all targets, e.g. 'all break test.js:10' or 'all memstats' """
+        if not args:
+            print("Error: Command expected")
+            return
+
+        self.print_results(self.manager.execute(args, broadcast=True))
+
+    def do_quit(self, _):
+        """ Exit all targets """
+        self.print_results(self.manager.execute("quit", broadcast=True))
+        return True
+
+    def do_EOF(self, _):  # pylint: disable=invalid-name
+        """ Exit all targets at the end of the input """
+        return self.do_quit(None)
+
+    def default(self, line):
+        self.print_results(self.manager.execute(line))
+
+    def emptyline(self):
+        pass
+
+
+def main():
+    args = arguments_parse()
+    manager = SessionManager(not args.non_interactive)
+
+    for address in args.address:
+        target = manager.add_target(address)
+
+        if args.color:
+            target.debugger.set_colors()
+
+        target.debugger.add_pending_breakpoints = args.pending
+
+        if args.exception is not None:
+            target.execute("exception %d" % (args.exception))
+
+    prompt = MultiTargetPrompt(manager)
+    prompt.print_results(manager.wait())
+    prompt.cmdloop()
+
+
+if __name__ == "__main__":
+    run_client(main)
@@ -0,0 +1,186 @@
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Programmatic interface of the JerryScript debugger client
+
+Example:
+
+    session = DebuggerSession("localhost:5001")
+    session.wait()
+    session.break_at("test.js:10")
+    hit = session.continue_until_hit()
+    print(hit["breakpoint"]["line"], session.backtrace())
+    session.close()
+
+Results are the event dictionaries of the --json output mode. The session never
+reads stdin: missing breakpoints are added as pending breakpoints and the text
+printed by the commands is collected in the log list. Many sessions can be driven
+from one thread by selecting on their fileno() and calling poll().
+"""
+
+from __future__ import print_function
+import select
+import time
+
+from jerry_client_ws import (DebuggerAction, DebuggerPrompt, JerryDebugger, set_breakpoint,
+                             JERRY_DEBUGGER_EVAL, JERRY_DEBUGGER_EVAL_EVAL, JERRY_DEBUGGER_EVAL_THROW)
+from jerry_client_ws_common import capture_output
+from jerry_client_ws_con import Connect
+
+
+class DebuggerSession(object):
+    """ Drives a JerryScript engine without user interaction """
+
+    def __init__(self, address, pending=True):
+        self.debugger = JerryDebugger(Connect(address))
+        self.debugger.json_output = True
+        self.debugger.add_pending_breakpoints = pending
+        self.prompt = DebuggerPrompt(self.debugger, self.debugger.connect)
+        self.prompt.non_interactive = True
+        # Output events of the target and the text printed by the commands.
+        self.output = []
+        self.log = []
+        self.stopped = False
+        self.closed = False
+        # The event which stopped the target the last time.
+        self.last_event = None
+
+    def _capture(self, function, *args):
+        """ Call the function and store everything it prints in the log """
+        result, text = capture_output(function, *args)
+
+        if text:
+            self.log.extend(text.rstrip("\n").split("\n"))
+        return result
+
+    def fileno(self):
+        return self.debugger.connect.client_socket.fileno()
+
+    def poll(self):
+        """ Process the available messages without blocking
+
+        Returns the received events. The session is stopped when the last
+        event is a breakpoint hit or a command result.
+        """
+        events = []
+
+        while not self.closed:
+            action = self.debugger.process_messages()
+
+            if action.type == DebuggerAction.END:
+                self.closed = True
+                self.stopped = False
+            elif action.type == DebuggerAction.WAIT:
+                break
+            elif action.type == DebuggerAction.TEXT:
+                self.output.append(action.event)
+                events.append(action.event)
+            elif self.debugger.repeats_remain:
+                self._capture(self.prompt.do_next, self.debugger.repeats_remain)
+            else:
+                self.stopped = True
+                self.last_event = action.event
+                events.append(action.event)
+                break
+
+        return events
+
+    def wait(self, timeout=None):
+        """ Wait until the target stops and return the event which stopped it, None if it exits """
+        end = None
+        if timeout is not None:
+            end = time.time() + timeout
+
+        while True:
+            self.poll()
+
+            if self.closed:
+                return None
+
+            if self.stopped:
+                return self.last_event
+
+            remaining = None
+            if end is not None:
+                remaining = end - time.time()
+                if remaining <= 0:
+                    raise Exception("Timeout while waiting for the target")
+
+            select.select([self.debugger.connect.client_socket], [], [], remaining)
+
+    def _resume(self, command, timeout):
+        if not self.stopped:
+            raise Exception("The target is not stopped")
+
+        self.stopped = False
+        self._capture(self.prompt.onecmd, command)
+        return self.wait(timeout)
+
+    def break_at(self, location):
+        """ Set breakpoints on a 'source:line' or function name location and return them """
+        return [breakpoint.to_dict() for breakpoint in self._capture(set_breakpoint, self.debugger, location, False)]
+
+    def delete(self, index):
+        """ Delete a breakpoint by index, or 'all', 'active' or 'pending' breakpoints """
+        self._capture(self.prompt.onecmd, "delete %s" % (index))
+
+    def breakpoints(self):
+        """ Return the active and pending breakpoints """
+        result = [breakpoint.to_dict() for breakpoint in self.debugger.active_breakpoint_list.values()]
+        result.extend([breakpoint.to_dict() for breakpoint in self.debugger.pending_breakpoint_list.values()])
+        return result
+
+    def continue_until_hit(self, timeout=None):
+        """ Resume the target and return the next breakpoint hit, None if the target exits """
+        return self._resume("continue", timeout)
+
+    def step(self, timeout=None):
+        return self._resume("step", timeout)
+
+    def next(self, count=1, timeout=None):
+        return self._resume("next %d" % (count) if count > 1 else "next", timeout)
+
+    def finish(self, timeout=None):
+        return self._resume("finish", timeout)
+
+    def backtrace(self, depth=0, timeout=None):
+        """ Return the frames of the call stack """
+        event = self._resume("backtrace %d" % (depth) if depth else "backtrace", timeout)
+        return event["frames"] if event else None
+
+    def eval(self, expression, timeout=None):
+        """ Evaluate the expression in the current frame and return the eval event """
+        return self._send_string(JERRY_DEBUGGER_EVAL_EVAL + expression, timeout)
+
+    def throw(self, expression, timeout=None):
+        return self._send_string(JERRY_DEBUGGER_EVAL_THROW + expression, timeout)
+
+    def _send_string(self, string, timeout):
+        if not self.stopped:
+            raise Exception("The target is not stopped")
+
+        self.stopped = False
+        self.debugger.send_string(string, JERRY_DEBUGGER_EVAL)
+        return self.wait(timeout)
+
+    def memstats(self, timeout=None):
+        return self._resume("memstats", timeout)
+
+    def close(self):
+        """ Remove the breakpoints, let the target run to completion and close the connection """
+        if not self.closed:
+            if self.stopped:
+                self._capture(self.prompt.onecmd, "quit")
+            self.debugger.connect.client_socket.close()
+            self.closed = True
@@ -0,0 +1,5 @@
+b do_coverage.js:16
+c
+c
+delete 1
+c
@@ -0,0 +1,8 @@
+break add
+break do_json_output.js:22
+c
+bt
+e a + b
+delete 1
+c
+c
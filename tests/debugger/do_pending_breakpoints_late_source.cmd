@@ -0,0 +1,8 @@
+break :3
+y
+break g
+y
+c
+list
+c
+c
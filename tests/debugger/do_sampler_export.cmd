@@ -0,0 +1,9 @@
+memstats
+b do_sampler_export.js:19
+c
+memstats
+memstats export /tmp/jerry_do_sampler_export.csv
+memstats export /tmp/jerry_do_sampler_export.json
+profile report
+profile export /tmp/jerry_do_sampler_export.folded
+c
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Drives two fake engines through the multi-target session manager """
+
+from __future__ import print_function
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(TESTS_DIR, "..", "..", "tools"))
+sys.path.append(os.path.join(TESTS_DIR, "..", "..", "jerry-debugger"))
+
+# pylint: disable=wrong-import-position
+from debugger_fake_server import FakeServer, create_breakpoint_hit, create_parse_session
+from jerry_client_ws_common import capture_output
+from jerry_client_ws_multi import MultiTargetPrompt, SessionManager
+
+
+def main():
+    # The address of the engine started by the runner is not used, the servers listen on free ports.
+    manager = SessionManager(False)
+    prompt = MultiTargetPrompt(manager)
+    addresses = []
+
+    def run(function, *args):
+        """ Call the function and print its output with the server addresses replaced by their names """
+        text = capture_output(function, *args)[1]
+        for index, address in enumerate(addresses):
+            text = text.replace(address, "fake-%d" % (index))
+        sys.stdout.write(text)
+
+    for functions in [1, 2]:
+        server = FakeServer(create_parse_session(functions, 4) + create_breakpoint_hit(), respond=True)
+        server.start()
+        addresses.append("localhost:%d" % (server.port))
+        run(manager.add_target, addresses[-1])
+
+    run(lambda: prompt.print_results(manager.wait()))
+
+    for line in ["targets", "bt", "target 1", "memstats", "target 2", "all memstats", "all eval 1 + 1", "quit",
+                 "targets"]:
+        run(prompt.onecmd, prompt.precmd(line))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" Drives session_api.js through the DebuggerSession interface """
+
+from __future__ import print_function
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "jerry-debugger"))
+
+from jerry_client_ws_session import DebuggerSession  # pylint: disable=wrong-import-position
+
+
+def show(name, result):
+    print("%s: %s" % (name, json.dumps(result, sort_keys=True)))
+
+
+def main():
+    session = DebuggerSession(sys.argv[1])
+
+    show("wait", session.wait(10))
+    # The target is already stopped, so the same stop event is returned.
+    show("wait again", session.wait(10))
+    show("break_at", session.break_at("f1"))
+    show("wait after break_at", session.wait(10))
+
+    show("continue_until_hit", session.continue_until_hit(10))
+    show("backtrace", session.backtrace(timeout=10))
+    show("eval", session.eval("f1() + 1", 10))
+    show("breakpoints", session.breakpoints())
+
+    session.delete("all")
+    show("breakpoints after delete", session.breakpoints())
+    show("continue_until_hit", session.continue_until_hit(10))
+    show("output", session.output)
+
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
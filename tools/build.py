@@ -28,6 +28,10 @@ BUILD_DIR = os.path.join(settings.PROJECT_DIR, 'build')
 
 DEFAULT_PROFILE = 'es5.1'
 
+COMPILER_CACHE = 'ccache'
+# CMake passes the compiler launchers to the builds since this version.
+COMPILER_LAUNCHER_CMAKE_VERSION = (3, 4)
+
 def default_toolchain():
     (sysname, _, _, _, machine) = os.uname()
     toolchain = os.path.join(settings.PROJECT_DIR,
@@ -35,6 +39,14 @@ def default_toolchain():
                              'toolchain_%s_%s.cmake' % (sysname.lower(), machine.lower()))
     return toolchain if os.path.isfile(toolchain) else None
 
+def get_compiler_cache_parser():
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--compiler-cache', metavar='X', choices=['ON', 'OFF'], default='OFF', type=str.upper,
+                        help='compile with %s, objects are shared between build directories (needs CMake %s or '
+                        'newer; %%(choices)s; default: %%(default)s)'
+                        % (COMPILER_CACHE, '.'.join(str(part) for part in COMPILER_LAUNCHER_CMAKE_VERSION)))
+    return parser
+
 def get_arguments():
     devhelp_preparser = argparse.ArgumentParser(add_help=False)
     devhelp_preparser.add_argument('--devhelp', action='store_true', default=False,
@@ -48,7 +60,7 @@ def get_arguments():
     def devhelp(helpstring):
         return helpstring if devhelp_arguments.devhelp else argparse.SUPPRESS
 
-    parser = argparse.ArgumentParser(parents=[devhelp_preparser])
+    parser = argparse.ArgumentParser(parents=[devhelp_preparser, get_compiler_cache_parser()])
     parser.add_argument('--all-in-one', metavar='X', choices=['ON', 'OFF'], default='OFF', type=str.upper,
                         help='all-in-one build (%(choices)s; default: %(default)s)')
     parser.add_argument('--builddir', metavar='DIR', action='store', default=BUILD_DIR,
@@ -181,6 +193,9 @@ def generate_build_options(arguments):
     if arguments.toolchain:
         build_options.append('-DCMAKE_TOOLCHAIN_FILE=%s' % arguments.toolchain)
 
+    if arguments.compiler_cache == 'ON':
+        build_options.append('-DCMAKE_C_COMPILER_LAUNCHER=%s' % COMPILER_CACHE)
+
     build_options.append('-DUNITTESTS=%s' % arguments.unittests)
     build_options.append('-DDOCTESTS=%s' % arguments.doctests)
     build_options.append('-DCMAKE_VERBOSE_MAKEFILE=%s' % arguments.verbose)
@@ -209,8 +224,29 @@ def configure_output_dir(arguments):
     if not os.path.exists(arguments.builddir):
         os.makedirs(arguments.builddir)
 
+def get_cmake_version():
+    try:
+        output = subprocess.check_output(['cmake', '--version'])
+    except (OSError, subprocess.CalledProcessError):
+        return ()
+
+    # The first line is 'cmake version X.Y.Z'.
+    try:
+        version = output.decode('utf-8', 'replace').split()[2]
+        return tuple(int(part) for part in version.split('.')[:2])
+    except (IndexError, ValueError):
+        return ()
+
+def configure_compiler_cache(arguments):
+    if arguments.compiler_cache == 'ON' and get_cmake_version() < COMPILER_LAUNCHER_CMAKE_VERSION:
+        # Older versions ignore CMAKE_C_COMPILER_LAUNCHER.
+        print('Warning: building without %s, compiler launchers need CMake %s or newer'
+              % (COMPILER_CACHE, '.'.join(str(part) for part in COMPILER_LAUNCHER_CMAKE_VERSION)))
+        arguments.compiler_cache = 'OFF'
+
 def configure_build(arguments):
     configure_output_dir(arguments)
+    configure_compiler_cache(arguments)
 
     build_options = generate_build_options(arguments)
 
@@ -219,8 +255,21 @@ def configure_build(arguments):
 
     return subprocess.call(cmake_cmd)
 
+def get_build_env(arguments):
+    env = dict(os.environ)
+
+    if arguments.compiler_cache == 'ON':
+        # The absolute paths are rewritten relative to the build directory and the directory
+        # is not hashed, so equal compile commands of different build directories hit the cache.
+        base_dir = os.path.commonprefix([settings.PROJECT_DIR + os.sep, arguments.builddir + os.sep])
+        env.setdefault('CCACHE_BASEDIR', os.path.dirname(base_dir))
+        env.setdefault('CCACHE_NOHASHDIR', '1')
+
+    return env
+
 def build_jerry(arguments):
-    return subprocess.call(['make', '--no-print-directory', '-j', str(arguments.jobs), '-C', arguments.builddir])
+    return subprocess.call(['make', '--no-print-directory', '-j', str(arguments.jobs), '-C', arguments.builddir],
+                           env=get_build_env(arguments))
 
 def print_result(ret):
     print('=' * 30)
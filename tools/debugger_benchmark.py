@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import argparse
+import gc
+import resource
+import socket
+import struct
+import time
+
+# pylint: disable=wrong-import-order
+from debugger_fake_server import FakeServer, MAX_PAYLOAD_SIZE, create_frame, create_parse_session
+import jerry_client_ws
+from jerry_client_ws_con import Connect
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the JerryScript debugger client')
+    subparsers = parser.add_subparsers(dest='benchmark')
+
+    reader_parser = subparsers.add_parser('reader', help='measure the frame reading throughput')
+    reader_parser.add_argument('--session', metavar='FILE', action='store', default=None,
+                               help='replay the server to client frames stored in FILE '
+                               'instead of a synthetic session')
+    reader_parser.add_argument('--size', metavar='MB', action='store', type=int, default=4,
+                               help='size of the synthetic session in megabytes (default: %(default)s)')
+    reader_parser.add_argument('--repeat', metavar='N', action='store', type=int, default=3,
+                               help='number of runs (default: %(default)s)')
+
+    memory_parser = subparsers.add_parser('memory', help='measure the memory used for a large parsed script')
+    memory_parser.add_argument('--functions', metavar='N', action='store', type=int, default=2500,
+                               help='number of functions in the script (default: %(default)s)')
+    memory_parser.add_argument('--breakpoints', metavar='N', action='store', type=int, default=20,
+                               help='number of breakpoints per function (default: %(default)s)')
+
+    upload_parser = subparsers.add_parser('upload', help='measure the client source upload throughput')
+    upload_parser.add_argument('--size', metavar='MB', action='store', type=int, default=4,
+                               help='size of the uploaded source in megabytes (default: %(default)s)')
+    upload_parser.add_argument('--repeat', metavar='N', action='store', type=int, default=3,
+                               help='number of runs (default: %(default)s)')
+
+    return parser.parse_args()
+
+
+def create_session(size):
+    """ Create a stream which sends a large source code followed by output messages """
+    frames = []
+    line = b'var x = 0; /* padding */\n'
+    fragment = (line * (MAX_PAYLOAD_SIZE // len(line) + 1))[:MAX_PAYLOAD_SIZE]
+    count = size * 1024 * 1024 // (2 * (len(fragment) + 3))
+
+    frames.extend([create_frame(jerry_client_ws.JERRY_DEBUGGER_SOURCE_CODE, fragment)] * count)
+    frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_SOURCE_CODE_END, fragment))
+
+    frames.extend([create_frame(jerry_client_ws.JERRY_DEBUGGER_OUTPUT_RESULT, fragment)] * count)
+    frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_OUTPUT_RESULT_END,
+                               b'done' + struct.pack('B', jerry_client_ws.JERRY_DEBUGGER_OUTPUT_OK)))
+    return b''.join(frames)
+
+
+def run_reader(stream):
+    server = FakeServer(stream)
+    server.start()
+
+    connect = Connect('localhost:%d' % server.port)
+    frames = 0
+
+    start = time.time()
+    while connect.get_message(True) is not None:
+        frames += 1
+    elapsed = time.time() - start
+
+    server.join()
+    return frames, elapsed
+
+
+def run_upload(source):
+    server = FakeServer(b'', drain=True)
+    server.start()
+
+    connect = Connect('localhost:%d' % server.port)
+    debugger = jerry_client_ws.JerryDebugger(connect)
+
+    start = time.time()
+    debugger.send_string(source, jerry_client_ws.JERRY_DEBUGGER_CLIENT_SOURCE)
+    connect.client_socket.shutdown(socket.SHUT_WR)
+    server.join()
+    elapsed = time.time() - start
+
+    connect.client_socket.close()
+    return server.received, elapsed
+
+
+def get_max_rss():
+    """ Return the peak resident set size of the process in kilobytes """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_memory(stream):
+    server = FakeServer(stream)
+    server.start()
+
+    connect = Connect('localhost:%d' % server.port)
+    debugger = jerry_client_ws.JerryDebugger(connect)
+
+    gc.collect()
+    start_rss = get_max_rss()
+    start = time.time()
+
+    while debugger.process_messages().type != jerry_client_ws.DebuggerAction.END:
+        pass
+
+    elapsed = time.time() - start
+    gc.collect()
+
+    server.join()
+    return debugger, get_max_rss() - start_rss, elapsed
+
+
+def main(options):
+    if options.benchmark == 'memory':
+        stream = create_parse_session(options.functions, options.breakpoints)
+        debugger, rss, elapsed = run_memory(stream)
+        breakpoints = options.functions * options.breakpoints
+
+        function_count = len(debugger.function_list)
+        print('Parsed %d functions with %d breakpoints in %.3f s' % (function_count, breakpoints, elapsed))
+        print('Resident memory growth: %.2f MB (%d bytes per breakpoint)' % (rss / 1024.0,
+                                                                             rss * 1024 // max(breakpoints, 1)))
+        return
+
+    if options.benchmark == 'upload':
+        line = b'var x = 0; /* padding */\n'
+        source = b'upload.js\0' + line * (options.size * 1024 * 1024 // len(line))
+
+        for _ in range(options.repeat):
+            size, elapsed = run_upload(source)
+            size /= 1024.0 * 1024.0
+            print('Sent %.2f MB of frames in %.3f s: %.2f MB/s' % (size, elapsed, size / max(elapsed, 1e-9)))
+        return
+
+    if options.session:
+        with open(options.session, 'rb') as session_file:
+            stream = session_file.read()
+    else:
+        stream = create_session(options.size)
+
+    size = len(stream) / (1024.0 * 1024.0)
+
+    for _ in range(options.repeat):
+        frames, elapsed = run_reader(stream)
+        print('Read %d frames (%.2f MB) in %.3f s: %.2f MB/s' % (frames, size, elapsed, size / max(elapsed, 1e-9)))
+
+
+if __name__ == '__main__':
+    main(get_arguments())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+
+# Copyright JS Foundation and other contributors, http://js.foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import argparse
+import os
+import socket
+import struct
+import sys
+import threading
+
+import settings
+
+sys.path.insert(0, os.path.dirname(settings.DEBUGGER_CLIENT_SCRIPT))
+
+# pylint: disable=wrong-import-position
+import jerry_client_ws
+from jerry_client_ws_con import JERRY_DEBUGGER_CONFIGURATION, JERRY_DEBUGGER_VERSION, WEBSOCKET_BINARY_FRAME, \
+                                WEBSOCKET_FIN_BIT
+
+# Receive limit of the engine: 128 byte buffer minus the websocket header and mask.
+MAX_MESSAGE_SIZE = 128 - 2 - 4
+MAX_PAYLOAD_SIZE = 125 - 1
+
+# Every scenario stops at the first breakpoint of the first function.
+HIT_BYTE_CODE_CP = 1
+HIT_OFFSET = 16
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Fake JerryScript debugger server which replays scripted sessions')
+    parser.add_argument('--port', metavar='PORT', action='store', type=int, default=5001,
+                        help='listening port (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='scenario')
+
+    source_parser = subparsers.add_parser('source', help='send a huge source code')
+    source_parser.add_argument('--size', metavar='MB', action='store', type=int, default=4,
+                               help='size of the source code in megabytes (default: %(default)s)')
+
+    functions_parser = subparsers.add_parser('functions', help='send a script with many functions')
+    functions_parser.add_argument('--functions', metavar='N', action='store', type=int, default=2500,
+                                  help='number of functions in the script (default: %(default)s)')
+    functions_parser.add_argument('--breakpoints', metavar='N', action='store', type=int, default=20,
+                                  help='number of breakpoints per function (default: %(default)s)')
+
+    output_parser = subparsers.add_parser('output', help='send a flood of output messages')
+    output_parser.add_argument('--size', metavar='MB', action='store', type=int, default=4,
+                               help='size of the output in megabytes (default: %(default)s)')
+
+    backtrace_parser = subparsers.add_parser('backtrace', help='answer backtrace requests with a deep backtrace')
+    backtrace_parser.add_argument('--depth', metavar='N', action='store', type=int, default=10000,
+                                  help='number of backtrace frames (default: %(default)s)')
+
+    return parser.parse_args()
+
+
+def create_frame(message_type, payload=b''):
+    return struct.pack('BBB',
+                       WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
+                       len(payload) + 1,
+                       message_type) + payload
+
+
+def create_list_frames(message_type, values):
+    """ Split the values into breakpoint list frames """
+    frames = []
+    count = MAX_PAYLOAD_SIZE // 4
+
+    for i in range(0, len(values), count):
+        chunk = values[i:i + count]
+        frames.append(create_frame(message_type, struct.pack('<%dI' % len(chunk), *chunk)))
+    return frames
+
+
+def create_string_frames(message_type, string):
+    """ Split the string into frames, the last frame has the end type (message_type + 1) """
+    frames = []
+    for i in range(0, len(string), MAX_PAYLOAD_SIZE):
+        frames.append(create_frame(message_type, string[i:i + MAX_PAYLOAD_SIZE]))
+    frames.append(create_frame(message_type + 1))
+    return frames
+
+
+def create_parse_session(functions, breakpoints, source_size=0):
+    """ Create a stream which sends a script with the given number of functions
+
+    Function i has the byte code cp i + 1 and breakpoints on the lines which follow
+    its declaration. The source is padded with extra lines up to source_size bytes.
+    """
+    lines = functions * (breakpoints + 2) + 1
+    source = b''.join([b'var x%d = %d;\n' % (i, i) for i in range(lines)])
+    if len(source) < source_size:
+        padding = b'var x = 0; /* padding */\n'
+        source += padding * ((source_size - len(source)) // len(padding))
+
+    frames = create_string_frames(jerry_client_ws.JERRY_DEBUGGER_SOURCE_CODE, source)
+    frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_SOURCE_CODE_NAME_END, b'fake.js'))
+
+    for function_index in range(functions):
+        line = function_index * (breakpoints + 2) + 1
+        frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_FUNCTION_NAME_END, b'f%d' % function_index))
+        frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_PARSE_FUNCTION, struct.pack('<II', line, 1)))
+
+        frames.extend(create_list_frames(jerry_client_ws.JERRY_DEBUGGER_BREAKPOINT_LIST,
+                                         [line + 1 + i for i in range(breakpoints)]))
+        frames.extend(create_list_frames(jerry_client_ws.JERRY_DEBUGGER_BREAKPOINT_OFFSET_LIST,
+                                         [16 + 4 * i for i in range(breakpoints)]))
+        frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_BYTE_CODE_CP,
+                                   struct.pack('<H', function_index + 1)))
+
+    frames.extend(create_list_frames(jerry_client_ws.JERRY_DEBUGGER_BREAKPOINT_LIST, [lines]))
+    frames.extend(create_list_frames(jerry_client_ws.JERRY_DEBUGGER_BREAKPOINT_OFFSET_LIST, [16]))
+    frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_BYTE_CODE_CP, struct.pack('<H', functions + 1)))
+    return b''.join(frames)
+
+
+def create_output_session(size):
+    """ Create a stream which sends output messages of about size bytes in total """
+    line = b'output of the fake server\n'
+    message = line * (4096 // len(line))
+    frames = []
+
+    for _ in range(max(size // len(message), 1)):
+        frames.extend(create_string_frames(jerry_client_ws.JERRY_DEBUGGER_OUTPUT_RESULT, message))
+        frames[-1] = create_frame(jerry_client_ws.JERRY_DEBUGGER_OUTPUT_RESULT_END,
+                                  struct.pack('B', jerry_client_ws.JERRY_DEBUGGER_OUTPUT_OK))
+    return b''.join(frames)
+
+
+def create_breakpoint_hit():
+    return create_frame(jerry_client_ws.JERRY_DEBUGGER_BREAKPOINT_HIT,
+                        struct.pack('<HI', HIT_BYTE_CODE_CP, HIT_OFFSET))
+
+
+def create_backtrace(depth):
+    """ Create the backtrace messages of depth frames, all stopped at the breakpoint hit """
+    frame = struct.pack('<HI', HIT_BYTE_CODE_CP, HIT_OFFSET)
+    count = MAX_PAYLOAD_SIZE // len(frame)
+    frames = []
+
+    while depth > count:
+        frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_BACKTRACE, frame * count))
+        depth -= count
+    frames.append(create_frame(jerry_client_ws.JERRY_DEBUGGER_BACKTRACE_END, frame * depth))
+    return b''.join(frames)
+
+
+class FakeServer(threading.Thread):
+    """ Accepts a single client and sends the given stream after the handshake
+
+    When respond is set, the server reads the messages of the client afterwards and
+    answers backtrace, eval and memstats requests, until a resume request (continue,
+    step, next or finish) ends the session or the client closes the connection.
+    When drain is set, everything the client sends is read and dropped instead.
+    """
+
+    def __init__(self, stream, port=0, respond=False, backtrace_depth=1, drain=False):
+        # pylint: disable=too-many-arguments
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.stream = stream
+        self.handler = None
+        if respond:
+            self.handler = self._respond
+        elif drain:
+            self.handler = self._drain
+        self.backtrace_depth = backtrace_depth
+        self.received = 0
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind(('localhost', port))
+        self.server_socket.listen(1)
+        self.port = self.server_socket.getsockname()[1]
+
+    def run(self):
+        client_socket, _ = self.server_socket.accept()
+        self.server_socket.close()
+
+        # The connection is used through file objects, which are unbuffered for writing.
+        client_file = client_socket.makefile('rb')
+        server_file = client_socket.makefile('wb', 0)
+
+        while client_file.readline() not in [b'\r\n', b'']:
+            pass
+
+        server_file.write(b'HTTP/1.1 101 Switching Protocols\r\n' +
+                          b'Upgrade: websocket\r\n' +
+                          b'Connection: Upgrade\r\n' +
+                          b'Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n\r\n')
+
+        server_file.write(struct.pack('BBBBBBB',
+                                      WEBSOCKET_BINARY_FRAME | WEBSOCKET_FIN_BIT,
+                                      5,
+                                      JERRY_DEBUGGER_CONFIGURATION,
+                                      MAX_MESSAGE_SIZE,
+                                      2,
+                                      1,
+                                      JERRY_DEBUGGER_VERSION))
+        server_file.write(self.stream)
+
+        if self.handler is not None:
+            self.handler(client_file, server_file)
+
+        client_file.close()
+        server_file.close()
+        client_socket.close()
+
+    def _drain(self, client_file, _):
+        while True:
+            data = client_file.read(65536)
+            if not data:
+                return
+            self.received += len(data)
+
+    def _respond(self, client_file, server_file):
+        eval_remaining = 0
+
+        while True:
+            header = client_file.read(2)
+            if len(header) < 2:
+                return
+
+            size = struct.unpack('BB', header)[1] & 0x7f
+            # The client masks its frames with a zero key, so the payload follows the mask as is.
+            payload = client_file.read(4 + size)[4:]
+            self.received += 2 + 4 + size
+
+            if not payload:
+                continue
+
+            message_type = struct.unpack('B', payload[0:1])[0]
+
+            if message_type in [jerry_client_ws.JERRY_DEBUGGER_CONTINUE,
+                                jerry_client_ws.JERRY_DEBUGGER_STEP,
+                                jerry_client_ws.JERRY_DEBUGGER_NEXT,
+                                jerry_client_ws.JERRY_DEBUGGER_FINISH]:
+                return
+
+            elif message_type == jerry_client_ws.JERRY_DEBUGGER_GET_BACKTRACE:
+                max_depth = struct.unpack('<I', payload[1:5])[0]
+                depth = self.backtrace_depth
+                if max_depth:
+                    depth = min(depth, max_depth)
+                server_file.write(create_backtrace(depth))
+
+            elif message_type == jerry_client_ws.JERRY_DEBUGGER_MEMSTATS:
+                server_file.write(create_frame(jerry_client_ws.JERRY_DEBUGGER_MEMSTATS_RECEIVE,
+                                               struct.pack('<5I', len(self.stream), 0, 0, 0, 0)))
+
+            elif message_type in [jerry_client_ws.JERRY_DEBUGGER_EVAL, jerry_client_ws.JERRY_DEBUGGER_EVAL_PART]:
+                if message_type == jerry_client_ws.JERRY_DEBUGGER_EVAL:
+                    eval_remaining = struct.unpack('<I', payload[1:5])[0] - (len(payload) - 5)
+                else:
+                    eval_remaining -= len(payload) - 1
+
+                if eval_remaining <= 0:
+                    server_file.write(create_frame(jerry_client_ws.JERRY_DEBUGGER_EVAL_RESULT_END,
+                                                   b'undefined' +
+                                                   struct.pack('B', jerry_client_ws.JERRY_DEBUGGER_EVAL_OK)))
+
+
+def create_scenario(options):
+    """ Return the stream and the backtrace depth of the selected scenario """
+    megabyte = 1024 * 1024
+
+    if options.scenario == 'source':
+        return create_parse_session(1, 20, options.size * megabyte) + create_breakpoint_hit(), 1
+
+    if options.scenario == 'functions':
+        return create_parse_session(options.functions, options.breakpoints) + create_breakpoint_hit(), 1
+
+    if options.scenario == 'output':
+        return (create_parse_session(1, 20) + create_output_session(options.size * megabyte) +
+                create_breakpoint_hit()), 1
+
+    return create_parse_session(1, 20) + create_breakpoint_hit(), options.depth
+
+
+def main(options):
+    stream, backtrace_depth = create_scenario(options)
+
+    server = FakeServer(stream, options.port, True, backtrace_depth)
+    megabytes = len(stream) / (1024.0 * 1024.0)
+    print('Fake debugger server listening on port %d (%.2f MB session)' % (server.port, megabytes))
+    sys.stdout.flush()
+
+    server.start()
+    while server.is_alive():
+        server.join(0.5)
+
+
+if __name__ == '__main__':
+    main(get_arguments())
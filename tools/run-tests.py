@@ -18,13 +18,33 @@ from __future__ import print_function
 
 import argparse
 import collections
+import hashlib
+import multiprocessing
+import multiprocessing.pool
 import os
+import re
+import shutil
+import stat
 import subprocess
 import sys
+import tempfile
 import settings
 
+from build import default_toolchain
+
 OUTPUT_DIR = os.path.join(settings.PROJECT_DIR, 'build', 'tests')
 
+# Each debugger test case listens on its own port, starting from this one.
+DEBUGGER_TEST_BASE_PORT = 5001
+
+# Sources which are hashed into the key of the on-disk build cache.
+BUILD_CACHE_SOURCES = ['CMakeLists.txt', 'cmake', 'jerry-core', 'jerry-ext', 'jerry-libc', 'jerry-libm',
+                       'jerry-main', 'jerry-port', 'third-party', 'tools/build.py', 'tools/settings.py']
+BUILD_CACHE_UNITTEST_SOURCES = ['tests/unit-core', 'tests/unit-ext', 'tests/unit-libm']
+BUILD_CACHE_DOCTEST_SOURCES = ['docs', 'tests/unit-doc']
+# The least recently used entries of the build cache are removed above this count.
+BUILD_CACHE_MAX_ENTRIES = 64
+
 Options = collections.namedtuple('Options', ['name', 'build_args', 'test_args'])
 Options.__new__.__defaults__ = ([], [])
 
@@ -200,6 +220,18 @@ def get_arguments():
                         help='Run buildoption-test')
     parser.add_argument('--all', '--precommit', action='store_true',
                         help='Run all tests')
+    parser.add_argument('-j', '--jobs', metavar='N', action='store', type=int, default=multiprocessing.cpu_count() + 1,
+                        help='Allowed N build jobs and jerry-debugger test cases at once, the build jobs are '
+                        'shared by the parallel builds (default: %(default)s)')
+    parser.add_argument('--parallel-builds', metavar='N', action='store', type=int,
+                        default=max(multiprocessing.cpu_count() // 2, 1),
+                        help='Build N configurations at once (default: %(default)s)')
+    parser.add_argument('--build-cache', metavar='DIR', action='store', default=None,
+                        help='Reuse the binaries built by earlier runs from DIR (default: OUTDIR/build-cache)')
+    parser.add_argument('--no-build-cache', action='store_true',
+                        help='Always build the binaries')
+    parser.add_argument('--no-compiler-cache', action='store_true',
+                        help='Do not compile with ccache even if it is installed')
 
     if len(sys.argv) == 1:
         parser.print_help()
@@ -210,11 +242,162 @@ def get_arguments():
     return script_args
 
 BINARY_CACHE = {}
-
-def create_binary(job, options):
+SOURCE_HASHES = {}
+COMPILER_VERSIONS = {}
+
+def hash_sources(sources):
+    """ Hash the paths and the content of the files under the sources of the project """
+    key = tuple(sources)
+    if key in SOURCE_HASHES:
+        return SOURCE_HASHES[key]
+
+    digest = hashlib.sha1()
+
+    for source in sources:
+        source_path = os.path.join(settings.PROJECT_DIR, source)
+        file_paths = [source_path]
+
+        if os.path.isdir(source_path):
+            file_paths = []
+            for dir_path, dir_names, file_names in os.walk(source_path):
+                dir_names.sort()
+                file_paths.extend([os.path.join(dir_path, file_name) for file_name in sorted(file_names)])
+
+        for file_path in file_paths:
+            if not os.path.isfile(file_path):
+                continue
+
+            digest.update(os.path.relpath(file_path, settings.PROJECT_DIR).encode('utf-8') + b'\0')
+            with open(file_path, 'rb') as source_file:
+                digest.update(source_file.read())
+
+    SOURCE_HASHES[key] = digest.hexdigest()
+    return SOURCE_HASHES[key]
+
+def get_toolchain(build_args):
+    """ Return the toolchain file of the build, build.py selects the default one when none is given """
+    toolchain = None
+    for index, arg in enumerate(build_args):
+        if arg.startswith('--toolchain='):
+            toolchain = arg[len('--toolchain='):]
+        elif arg == '--toolchain' and index + 1 < len(build_args):
+            toolchain = build_args[index + 1]
+
+    return default_toolchain() if toolchain is None else toolchain
+
+def get_compiler(toolchain):
+    """ Return the C compiler of the builds, the toolchain file selects it when one is given """
+    if toolchain:
+        with open(toolchain, 'r') as toolchain_file:
+            match = re.search(r'set\s*\(\s*CMAKE_C_COMPILER\s+"?([^\s")]+)', toolchain_file.read())
+        if match:
+            return match.group(1)
+
+    return os.environ.get('CC', 'cc')
+
+def get_compiler_version(compiler):
+    if compiler not in COMPILER_VERSIONS:
+        try:
+            version = subprocess.check_output([compiler, '--version'], stderr=subprocess.STDOUT)
+        except (OSError, subprocess.CalledProcessError):
+            version = b''
+        COMPILER_VERSIONS[compiler] = version
+
+    return COMPILER_VERSIONS[compiler]
+
+def get_build_hash(build_args):
+    """ Return the key of a build: its arguments, toolchain, compiler and sources """
+    digest = hashlib.sha1()
+    digest.update('\0'.join(build_args).encode('utf-8') + b'\0')
+
+    toolchain = get_toolchain(build_args)
+    if toolchain:
+        with open(toolchain, 'rb') as toolchain_file:
+            digest.update(toolchain_file.read())
+
+    compiler = get_compiler(toolchain)
+    digest.update(compiler.encode('utf-8') + b'\0')
+    digest.update(get_compiler_version(compiler))
+
+    sources = BUILD_CACHE_SOURCES[:]
+    if '--unittests' in build_args:
+        sources.extend(BUILD_CACHE_UNITTEST_SOURCES)
+    if '--doctests' in build_args:
+        sources.extend(BUILD_CACHE_DOCTEST_SOURCES)
+
+    digest.update(hash_sources(sources).encode('utf-8'))
+    return digest.hexdigest()
+
+def has_compiler_cache():
+    """ The objects of the configurations are shared through ccache when it is installed """
+    return any(os.access(os.path.join(path, 'ccache'), os.X_OK) for path in os.environ['PATH'].split(os.pathsep))
+
+def get_build_cache_dir(options):
+    if options.no_build_cache:
+        return None
+    return options.build_cache or os.path.join(options.outdir, 'build-cache')
+
+def set_write_permission(path, enabled):
+    """ Add or remove the write permission of the files and directories under the path """
+    for dir_path, _, file_names in os.walk(path):
+        for name in [dir_path] + [os.path.join(dir_path, file_name) for file_name in file_names]:
+            if os.path.islink(name):
+                continue
+
+            mode = os.stat(name).st_mode
+            os.chmod(name, (mode | stat.S_IWUSR) if enabled else (mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)))
+
+def store_binaries(bin_dir_path, cache_dir_path):
+    """ Copy the built binaries into the cache, the entry appears atomically and it is read-only """
+    if os.path.isdir(cache_dir_path):
+        return
+
+    cache_root = os.path.dirname(cache_dir_path)
+    if not os.path.isdir(cache_root):
+        try:
+            os.makedirs(cache_root)
+        except OSError:
+            # Created by a parallel build.
+            pass
+
+    temp_dir_path = tempfile.mkdtemp(dir=cache_root)
+    try:
+        shutil.copytree(bin_dir_path, os.path.join(temp_dir_path, 'bin'))
+        # The binaries are only copied out of the cache, they are never used in place.
+        set_write_permission(os.path.join(temp_dir_path, 'bin'), False)
+        os.rename(temp_dir_path, cache_dir_path)
+    except OSError:
+        # Stored by a parallel build.
+        set_write_permission(temp_dir_path, True)
+        shutil.rmtree(temp_dir_path, ignore_errors=True)
+
+    prune_build_cache(cache_root)
+
+def prune_build_cache(cache_root):
+    """ Remove the least recently used entries above BUILD_CACHE_MAX_ENTRIES, entries are touched when used """
+    entries = []
+    for name in os.listdir(cache_root):
+        # Entries are named by their build hash, the temporary directories of parallel stores are skipped.
+        if not re.match(r'^[0-9a-f]{40}$', name):
+            continue
+
+        try:
+            entries.append((os.path.getmtime(os.path.join(cache_root, name)), name))
+        except OSError:
+            # Removed by a parallel run.
+            pass
+
+    for _, name in sorted(entries)[:-BUILD_CACHE_MAX_ENTRIES]:
+        set_write_permission(os.path.join(cache_root, name), True)
+        shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+
+def create_binary(job, options, jobs=None):
     build_cmd = [settings.BUILD_SCRIPT]
     build_cmd.extend(job.build_args)
 
+    if jobs is not None:
+        build_cmd.append('--jobs=%d' % jobs)
+
     build_dir_path = os.path.join(options.outdir, job.name)
     build_cmd.append('--builddir=%s' % build_dir_path)
 
@@ -224,6 +407,9 @@ def create_binary(job, options):
     if options.buildoptions:
         build_cmd.extend(options.buildoptions.split(','))
 
+    if not options.no_compiler_cache and has_compiler_cache():
+        build_cmd.append('--compiler-cache=on')
+
     sys.stderr.write('Build command: %s\n' % ' '.join(build_cmd))
 
     binary_key = tuple(job.build_args)
@@ -232,15 +418,60 @@ def create_binary(job, options):
         sys.stderr.write('(skipping: already built at %s with returncode %d)\n' % (build_dir_path, ret))
         return ret, os.path.join(build_dir_path, 'bin')
 
+    cache_dir_path = None
+    build_cache_dir = get_build_cache_dir(options)
+    if build_cache_dir:
+        build_args = [arg for arg in build_cmd[1:]
+                      if not arg.startswith(('--jobs=', '--builddir=', '--compiler-cache='))]
+        cache_dir_path = os.path.join(build_cache_dir, get_build_hash(build_args))
+
+        if os.path.isdir(cache_dir_path):
+            sys.stderr.write('(skipping: cached build found at %s)\n' % cache_dir_path)
+            os.utime(cache_dir_path, None)
+
+            # The tests write their results next to the binaries, so they run from a copy in the build directory.
+            bin_dir_path = os.path.join(build_dir_path, 'bin')
+            if os.path.isdir(bin_dir_path):
+                set_write_permission(bin_dir_path, True)
+                shutil.rmtree(bin_dir_path)
+            shutil.copytree(os.path.join(cache_dir_path, 'bin'), bin_dir_path)
+            set_write_permission(bin_dir_path, True)
+
+            BINARY_CACHE[binary_key] = (0, build_dir_path)
+            return 0, bin_dir_path
+
     try:
-        subprocess.check_output(build_cmd)
+        # The output is captured, so the messages of parallel builds are not mixed.
+        subprocess.check_output(build_cmd, stderr=subprocess.STDOUT)
         ret = 0
     except subprocess.CalledProcessError as err:
+        sys.stderr.write(err.output)
         ret = err.returncode
 
+    if ret == 0 and cache_dir_path:
+        store_binaries(os.path.join(build_dir_path, 'bin'), cache_dir_path)
+
     BINARY_CACHE[binary_key] = (ret, build_dir_path)
     return ret, os.path.join(build_dir_path, 'bin')
 
+def create_binaries(jobs, options):
+    """ Build the binaries of the jobs in parallel and yield (job, returncode, bin_dir_path) in order
+
+    The build jobs of -j are shared by the parallel builds. A binary is yielded as soon
+    as it is ready, so its tests can run while the rest of the binaries are built.
+    """
+    parallel_builds = max(min(options.parallel_builds, len(jobs)), 1)
+    build_jobs = max(options.jobs // parallel_builds, 1)
+    pool = multiprocessing.pool.ThreadPool(parallel_builds)
+
+    try:
+        for result in pool.imap(lambda job: (job,) + create_binary(job, options, build_jobs), jobs):
+            yield result
+    finally:
+        # The builds which are not started yet are dropped when the caller stops early.
+        pool.terminate()
+        pool.join()
+
 def run_check(runnable):
     sys.stderr.write('Test command: %s\n' % ' '.join(runnable))
 
@@ -251,35 +482,68 @@ def run_check(runnable):
 
     return ret
 
+def run_check_captured(runnable):
+    """ Run the command and return its exit code and output """
+    process = subprocess.Popen(runnable, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = process.communicate()[0]
+    return process.returncode, runnable, output
+
+def run_checks_parallel(runnables, jobs):
+    """ Run the commands on jobs threads, the output of each command is printed when it finishes """
+    ret = 0
+    pool = multiprocessing.pool.ThreadPool(max(jobs, 1))
+
+    try:
+        for returncode, runnable, output in pool.imap(run_check_captured, runnables):
+            sys.stderr.write('Test command: %s\n' % ' '.join(runnable))
+            sys.stdout.write(output)
+            sys.stdout.flush()
+            ret |= returncode
+    finally:
+        pool.close()
+        pool.join()
+
+    return ret
+
 def run_jerry_debugger_tests(options):
     ret_build = ret_test = 0
-    for job in DEBUGGER_TEST_OPTIONS:
-        ret_build, bin_dir_path = create_binary(job, options)
+    for job, ret_build, bin_dir_path in create_binaries(DEBUGGER_TEST_OPTIONS, options):
         if ret_build:
             break
 
-        for test_file in os.listdir(settings.DEBUGGER_TESTS_DIR):
-            if test_file.endswith(".cmd"):
-                test_case, _ = os.path.splitext(test_file)
-                test_case_path = os.path.join(settings.DEBUGGER_TESTS_DIR, test_case)
-                test_cmd = [
-                    settings.DEBUGGER_TEST_RUNNER_SCRIPT,
-                    get_binary_path(bin_dir_path),
-                    settings.DEBUGGER_CLIENT_SCRIPT,
-                    os.path.relpath(test_case_path, settings.PROJECT_DIR)
-                ]
+        test_cmds = []
+        for test_file in sorted(os.listdir(settings.DEBUGGER_TESTS_DIR)):
+            test_case, test_ext = os.path.splitext(test_file)
+            test_case_path = os.path.join(settings.DEBUGGER_TESTS_DIR, test_case)
+
+            # Command files are fed to the client, python cases are scripts driving the engine themselves.
+            if test_ext == ".cmd":
+                debugger_client = settings.DEBUGGER_CLIENT_SCRIPT
+            elif test_ext == ".py":
+                debugger_client = os.path.join(settings.DEBUGGER_TESTS_DIR, test_file)
+            else:
+                continue
+
+            test_cmd = [
+                settings.DEBUGGER_TEST_RUNNER_SCRIPT,
+                get_binary_path(bin_dir_path),
+                debugger_client,
+                os.path.relpath(test_case_path, settings.PROJECT_DIR),
+                str(DEBUGGER_TEST_BASE_PORT + len(test_cmds))
+            ]
+
+            if job.test_args:
+                test_cmd.extend(job.test_args)
 
-                if job.test_args:
-                    test_cmd.extend(job.test_args)
+            test_cmds.append(test_cmd)
 
-                ret_test |= run_check(test_cmd)
+        ret_test |= run_checks_parallel(test_cmds, options.jobs)
 
     return ret_build | ret_test
 
 def run_jerry_tests(options):
     ret_build = ret_test = 0
-    for job in JERRY_TESTS_OPTIONS:
-        ret_build, bin_dir_path = create_binary(job, options)
+    for job, ret_build, bin_dir_path in create_binaries(JERRY_TESTS_OPTIONS, options):
         if ret_build:
             break
 
@@ -313,8 +577,7 @@ def run_jerry_tests(options):
 
 def run_jerry_test_suite(options):
     ret_build = ret_test = 0
-    for job in JERRY_TEST_SUITE_OPTIONS:
-        ret_build, bin_dir_path = create_binary(job, options)
+    for job, ret_build, bin_dir_path in create_binaries(JERRY_TEST_SUITE_OPTIONS, options):
         if ret_build:
             break
 
@@ -342,8 +605,7 @@ def run_jerry_test_suite(options):
 
 def run_test262_test_suite(options):
     ret_build = ret_test = 0
-    for job in TEST262_TEST_SUITE_OPTIONS:
-        ret_build, bin_dir_path = create_binary(job, options)
+    for job, ret_build, bin_dir_path in create_binaries(TEST262_TEST_SUITE_OPTIONS, options):
         if ret_build:
             break
 
@@ -362,8 +624,7 @@ def run_test262_test_suite(options):
 
 def run_unittests(options):
     ret_build = ret_test = 0
-    for job in JERRY_UNITTESTS_OPTIONS:
-        ret_build, bin_dir_path = create_binary(job, options)
+    for _, ret_build, bin_dir_path in create_binaries(JERRY_UNITTESTS_OPTIONS, options):
         if ret_build:
             break
 
@@ -376,8 +637,8 @@ def run_unittests(options):
     return ret_build | ret_test
 
 def run_buildoption_test(options):
-    for job in JERRY_BUILDOPTIONS:
-        ret, _ = create_binary(job, options)
+    ret = 0
+    for _, ret, _ in create_binaries(JERRY_BUILDOPTIONS, options):
         if ret:
             break
 
@@ -17,26 +17,73 @@
 JERRY=$1
 DEBUGGER_CLIENT=$2
 TEST_CASE=$3
+PORT=${4:-5001}
 CLIENT_ARGS=""
 
+# Wait until the engine listens on the port. The port is not probed with a
+# connection, since the engine accepts only a single client.
+wait_for_server() {
+  local LISTEN_PATTERN=$(printf ':%04X 00000000:0000 0A' ${PORT})
+
+  if [ ! -r /proc/net/tcp ]; then
+    sleep 1s
+    return
+  fi
+
+  for i in $(seq 200); do
+    if grep -q "${LISTEN_PATTERN}" /proc/net/tcp; then
+      return
+    fi
+    sleep 0.05s
+  done
+}
+
 if [[ $TEST_CASE == *"client_source"* ]]; then
-  START_DEBUG_SERVER="${JERRY} --start-debug-server --debugger-wait-source &"
+  START_DEBUG_SERVER="${JERRY} --start-debug-server --debug-port ${PORT} --debugger-wait-source &"
   if [[ $TEST_CASE == *"client_source_multiple"* ]]; then
     CLIENT_ARGS="--client-source ${TEST_CASE}_2.js ${TEST_CASE}_1.js"
   else
     CLIENT_ARGS="--client-source ${TEST_CASE}.js"
   fi
-else
-  START_DEBUG_SERVER="${JERRY} ${TEST_CASE}.js --start-debug-server &"
+elif [ -f "${TEST_CASE}.js" ]; then
+  START_DEBUG_SERVER="${JERRY} ${TEST_CASE}.js --start-debug-server --debug-port ${PORT} &"
+fi
+
+if [[ $TEST_CASE == *"json"* ]]; then
+  CLIENT_ARGS="--json"
 fi
 
-echo "$START_DEBUG_SERVER"
-eval "$START_DEBUG_SERVER"
-sleep 1s
+if [[ $TEST_CASE == *"coverage"* ]]; then
+  COVERAGE_FILE="${TEST_CASE}.info"
+  CLIENT_ARGS="--coverage ${COVERAGE_FILE}"
+fi
+
+# Script cases without a source file do not need an engine.
+if [ -n "$START_DEBUG_SERVER" ]; then
+  echo "$START_DEBUG_SERVER"
+  eval "$START_DEBUG_SERVER"
+  wait_for_server
+fi
 
 RESULT_TEMP=`mktemp ${TEST_CASE}.out.XXXXXXXXXX`
 
-(cat "${TEST_CASE}.cmd" | ${DEBUGGER_CLIENT} --non-interactive ${CLIENT_ARGS}) &> ${RESULT_TEMP}
+if [ ! -f "${TEST_CASE}.cmd" ]; then
+  # Cases without a command file are scripts which drive the engine themselves.
+  ${DEBUGGER_CLIENT} localhost:${PORT} &> ${RESULT_TEMP}
+elif [[ $CLIENT_ARGS == *"--json"* ]]; then
+  # Only the events are printed to stdout in JSON mode, they are compared without the other text.
+  (cat "${TEST_CASE}.cmd" | ${DEBUGGER_CLIENT} localhost:${PORT} --non-interactive ${CLIENT_ARGS}) > ${RESULT_TEMP} 2> /dev/null
+else
+  (cat "${TEST_CASE}.cmd" | ${DEBUGGER_CLIENT} localhost:${PORT} --non-interactive ${CLIENT_ARGS}) &> ${RESULT_TEMP}
+fi
+# The exported coverage is compared after the output of the client.
+if [ -n "${COVERAGE_FILE}" ]; then
+  cat ${COVERAGE_FILE} >> ${RESULT_TEMP}
+  rm -f ${COVERAGE_FILE}
+fi
+
+# The expected results are recorded with the default port.
+sed -i "1s/^Connecting to: localhost:${PORT}$/Connecting to: localhost:5001/" ${RESULT_TEMP}
 diff -U0 ${TEST_CASE}.expected ${RESULT_TEMP}
 STATUS_CODE=$?
 